@@ -9,16 +9,24 @@ try:
 except ImportError:
     pass
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+import itertools
+import json
+import re
 import uuid
 import time
 from datetime import timedelta
 
 from interviewer import Interviewer
 from model.stt import WhisperSTT
-from database.db_helper import init_db, save_transcript, get_transcript, save_answer, get_session
+from model.stt_service import STTClient
+from model.followups import PROMPT as FOLLOWUP_PROMPT, clean_followup
+from model.tts import TTSCache
+from model.warmup import BackgroundLoader
+from utils.media_janitor import MediaJanitor
+from database.db_helper import init_db, save_transcript, get_transcript, get_session, unit_of_work
 from database.auth_helper import (
     init_auth_db, create_user, get_user_by_email, 
     get_user_by_id, verify_password, link_session_to_user
@@ -57,41 +65,84 @@ jwt = JWTManager(app)
 init_db(DB_PATH)
 init_auth_db(AUTH_DB_PATH)
 
-# Create the interviewer engine
-interviewer = Interviewer(model_dir=MODEL_DIR, db_path=DB_PATH)
-stt_engine = WhisperSTT()
 
-def synthesize_tts(text, session_id):
+def build_stt_engine():
+    # STT_MODE=service hands transcription to the shared pool started with
+    # `python -m model.stt_service` instead of loading Whisper in every worker
+    if os.getenv("STT_MODE", "local").lower() == "service":
+        return STTClient()
+    stt = WhisperSTT()
+    # WhisperSTT keeps going without a model; fail the warm-up so /ready reports it
+    if stt.model is None:
+        raise RuntimeError(f"Whisper model {stt.model_name} failed to load: {stt.load_error}")
+    return stt
+
+
+# Models warm up on background threads so the worker can serve /health and
+# /ready immediately; routes that need a model answer 503 until it is ready.
+interviewer_loader = BackgroundLoader("interviewer", lambda: Interviewer(model_dir=MODEL_DIR, db_path=DB_PATH))
+stt_loader = BackgroundLoader("stt", build_stt_engine)
+MODEL_LOADERS = (interviewer_loader, stt_loader)
+# Whisper is optional (requirements-light.txt leaves out torch/transformers):
+# unless STT_REQUIRED=1 a worker whose STT failed to load still serves
+# interviews, answering from text, and /ready reports it as degraded
+OPTIONAL_LOADERS = () if os.getenv("STT_REQUIRED", "0") == "1" else (stt_loader,)
+
+
+def not_ready(loader):
+    body = {"error": f"{loader.name} is not ready", "model": loader.name}
+    body.update(loader.status())
+    resp = jsonify(body)
+    resp.headers["Retry-After"] = "5"
+    return resp, 503
+
+# Rendered questions are shared across sessions: media/tts/_cache/<hash>.wav
+tts_cache = TTSCache(media_root=os.path.join(FRONTEND_DIR, "media"))
+# /tts/stream needs PCM per sentence, so it keeps WAV fragments even when
+# TTS_FORMAT compresses the main cache; both share one engine
+tts_stream_cache = tts_cache if tts_cache.format == "wav" else TTSCache(
+    media_root=os.path.join(FRONTEND_DIR, "media"), renderer=tts_cache.renderer, fmt="wav")
+
+
+def synthesize_tts(text, session_id=None):
     if not text:
         return None
-    try:
-        media_dir = os.path.join(FRONTEND_DIR, "media", "tts", session_id)
-        os.makedirs(media_dir, exist_ok=True)
-        filename = f"tts_{int(time.time())}.wav"
-        full_path = os.path.join(media_dir, filename)
-        import pyttsx3
-        engine = pyttsx3.init()
-        
-        # Set voice to female if possible (based on user preference)
-        voices = engine.getProperty('voices')
-        for voice in voices:
-            # Look for female voices
-            if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                engine.setProperty('voice', voice.id)
-                break
-            elif 'woman' in voice.name.lower() or 'girl' in voice.name.lower():
-                engine.setProperty('voice', voice.id)
-                break
-        
-        # Set reasonable speech rate
-        engine.setProperty('rate', 130)
-        
-        engine.save_to_file(text, full_path)
-        engine.runAndWait()
-        return f"/media/tts/{session_id}/{filename}"
-    except Exception as e:
-        print(f"TTS Error: {e}")
-        return None
+    return tts_cache.render(text)
+
+
+def queue_tts(text):
+    """TTS fields for a response without waiting for synthesis.
+
+    ``tts_url`` is set only when the audio is already cached; otherwise the
+    client polls ``tts_status_url`` (or sets TTS_ASYNC=0 to render inline).
+    """
+    if not text:
+        return {"tts_url": None, "tts_job_id": None, "tts_status_url": None}
+    if os.getenv("TTS_ASYNC", "1") == "0":
+        url = synthesize_tts(text)
+        return {"tts_url": url, "tts_job_id": tts_cache.key(text), "tts_status_url": None}
+    job_id = tts_cache.submit(text)
+    return {
+        "tts_url": tts_cache.url_for(job_id) if tts_cache.status(job_id) == "ready" else None,
+        "tts_job_id": job_id,
+        "tts_status_url": f"/tts/status/{job_id}",
+    }
+
+
+def prerender_question_audio():
+    interviewer = interviewer_loader.wait()
+    if interviewer is None:
+        return 0
+    return tts_cache.prerender(interviewer.bank_questions())
+
+
+if os.getenv("TTS_PRERENDER", "1") != "0":
+    tts_prerender_loader = BackgroundLoader("tts_prerender", prerender_question_audio)
+
+# Expires old session media and keeps frontend/media under MEDIA_MAX_BYTES
+media_janitor = MediaJanitor(os.path.join(FRONTEND_DIR, "media"))
+if os.getenv("MEDIA_JANITOR", "1") != "0":
+    media_janitor.start()
 
 # Root and health endpoints
 @app.route("/", methods=["GET"])
@@ -106,6 +157,14 @@ def interview_page():
 def health():
     return jsonify({"status":"healthy","time": int(time.time())})
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    models = {loader.name: loader.status() for loader in MODEL_LOADERS}
+    degraded = [loader.name for loader in OPTIONAL_LOADERS if loader.state == BackgroundLoader.FAILED]
+    all_ready = all(loader.ready or loader.name in degraded for loader in MODEL_LOADERS)
+    return jsonify({"ready": all_ready, "degraded": degraded, "models": models, "time": int(time.time())}), \
+        (200 if all_ready else 503)
+
 # Authentication routes
 @app.route("/api/auth/register", methods=["POST"])
 def register():
@@ -185,6 +244,10 @@ def get_current_user():
 
 @app.route("/start", methods=["POST"])
 def start():
+    interviewer = interviewer_loader.get()
+    if interviewer is None:
+        return not_ready(interviewer_loader)
+
     data = request.get_json() or {}
     session_id = data.get("session_id")
     
@@ -203,28 +266,27 @@ def start():
             track = data.get("track") or "Software Engineer"
             candidate_name = data.get("candidate_name") or ""
 
-    # Ensure a media directory exists for this session
-    media_dir = os.path.join(FRONTEND_DIR, "media", session_id)
-    os.makedirs(media_dir, exist_ok=True)
-
     first_question = interviewer.start_session(session_id=session_id, role=track, candidate_name=candidate_name)
 
     bot_video_path = os.path.join(FRONTEND_DIR, "media", "bot.mp4")
     bot_video_url = "/media/bot.mp4" if os.path.exists(bot_video_path) else None
     bot_image_url = "/media/bot.svg"
-    tts_url = synthesize_tts(first_question, session_id)
-
-    return jsonify({
+    resp = {
         "session_id": session_id,
         "question": first_question,
         "bot_video_url": bot_video_url,
         "bot_image_url": bot_image_url,
-        "tts_url": tts_url
-    })
+    }
+    resp.update(queue_tts(first_question))
+    return jsonify(resp)
 
 
 @app.route("/answer", methods=["POST"])
 def answer():
+    interviewer = interviewer_loader.get()
+    if interviewer is None:
+        return not_ready(interviewer_loader)
+
     session_id = None
     answer_text = ""
     saved_media_path = None
@@ -242,39 +304,29 @@ def answer():
     except Exception:
         file = None
         
+    if file and stt_loader.state == BackgroundLoader.LOADING:
+        return not_ready(stt_loader)
+    stt_engine = stt_loader.get()
+
     if file:
         sid = session_id or (request.form.get("session_id") if request.form else None)
         if sid:
-            # We no longer save video permanently to save space
-            # Instead, save to temp file -> transcribe -> delete
-            import tempfile
-            
-            # Determine extension
+            # We no longer save video permanently to save space.
+            # Decode straight from the upload stream; the STT engine only
+            # spills to a temp file if the decoder that handles it needs a path.
             ext = ".webm"
             if file.filename and "." in file.filename:
                 ext = "." + file.filename.rsplit(".", 1)[1]
-                
-            fd, temp_path = tempfile.mkstemp(suffix=ext)
-            os.close(fd)
-            
+
             try:
-                file.save(temp_path)
-                
                 # Transcribe using improved STT
                 if stt_engine:
-                    transcribed = stt_engine.transcribe_file(temp_path)
+                    transcribed = stt_engine.transcribe_stream(file.stream, ext=ext)
                     if transcribed and transcribed.strip():
                         answer_text = transcribed.strip()
             except Exception as e:
                 print(f"Processing error: {e}")
-            finally:
-                # Always clean up temp file to save space
-                try:
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-                except:
-                    pass
-            
+
             # Do NOT save audio/video path to DB
             saved_media_path = None
 
@@ -291,25 +343,28 @@ def answer():
 
 
 
-    resp = interviewer.handle_answer(session_id, answer_text)
+    # The turn and the scored answer are written on one connection and committed together
+    with unit_of_work(DB_PATH) as uow:
+        resp = interviewer.handle_answer(session_id, answer_text, uow=uow)
+        resp = dict(resp or {})
+
+        # Persist this answer with media and scoring
+        try:
+            uow.save_answer(session_id, answer_text, saved_media_path, resp.get("score"), resp.get("feedback"))
+        except Exception as e:
+            print(f"Could not save answer: {e}")
 
     # Include media info and bot assets in response
-    resp = dict(resp or {})
     resp["media_path"] = saved_media_path
     bot_video_path = os.path.join(FRONTEND_DIR, "media", "bot.mp4")
     resp["bot_video_url"] = "/media/bot.mp4" if os.path.exists(bot_video_path) else None
     resp["bot_image_url"] = "/media/bot.svg"
-    # Generate TTS for next question if available
-    next_q = resp.get("next_question")
-    resp["tts_url"] = synthesize_tts(next_q, session_id) if next_q else None
+    # Queue TTS for the next question; the client polls tts_status_url
+    resp.update(queue_tts(resp.get("next_question")))
 
-    # Persist this answer with media and scoring
-    try:
-        save_answer(DB_PATH, session_id, answer_text, saved_media_path, resp.get("score"), resp.get("feedback"))
-    except Exception:
-        pass
-
-    return jsonify(resp)
+    response = jsonify(resp)
+    response.headers["Server-Timing"] = f"db;dur={uow.seconds * 1000:.2f}"
+    return response
 
 
 @app.route("/tts", methods=["POST"])
@@ -320,6 +375,117 @@ def tts():
     url = synthesize_tts(text, session_id)
     return jsonify({"tts_url": url})
 
+@app.route("/tts/stream", methods=["GET", "POST"])
+def tts_stream():
+    if request.method == "POST":
+        text = (request.get_json(silent=True) or {}).get("text")
+    else:
+        text = request.args.get("text")
+    text = (text or "").strip()
+    if not text:
+        return jsonify({"error": "text missing"}), 400
+    # Whole utterance already rendered (e.g. a pre-rendered question): send the file
+    for cache in (tts_cache, tts_stream_cache):
+        if cache.lookup(text):
+            return send_file(cache.path_for(cache.key(text)), mimetype=cache.mimetype, conditional=True)
+    chunks = tts_stream_cache.stream(text)
+    first = next(chunks, None)
+    if first is None:
+        return jsonify({"error": "speech synthesis failed"}), 503
+    return Response(stream_with_context(itertools.chain([first], chunks)), mimetype="audio/wav",
+                    headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"})
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route("/generate/stream", methods=["GET", "POST"])
+def generate_stream():
+    interviewer = interviewer_loader.get()
+    if interviewer is None:
+        return not_ready(interviewer_loader)
+    data = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args
+    # Only interviewer text: the route is unauthenticated, so callers cannot
+    # supply their own prompt, just the question to draft a follow-up to
+    question = (data.get("question") or "").strip()
+    if not question:
+        return jsonify({"error": "question missing"}), 400
+    prompt = FOLLOWUP_PROMPT.format(role=data.get("role") or "Software Engineer", question=question)
+    try:
+        max_tokens = data.get("max_tokens")
+        max_tokens = min(int(max_tokens) if max_tokens not in (None, "") else 120,
+                         int(os.getenv("GENERATE_MAX_TOKENS", 256)))
+        temperature = float(data["temperature"]) if data.get("temperature") not in (None, "") else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_tokens and temperature must be numbers"}), 400
+    if max_tokens < 1:
+        return jsonify({"error": "max_tokens must be at least 1"}), 400
+
+    def events():
+        t0 = time.perf_counter()
+        ttft = None
+        pieces = []
+        # The track's model stays loaded until the stream ends
+        with interviewer.models.lease(data.get("role")) as pipeline:
+            stream = pipeline.generate_stream(prompt, max_length=max_tokens, temperature=temperature)
+            try:
+                for piece in stream:
+                    if ttft is None:
+                        ttft = time.perf_counter() - t0
+                    pieces.append(piece)
+                    yield sse("token", {"text": piece})
+            except Exception as e:
+                print(f"Generation stream error: {e}")
+                yield sse("error", {"error": "generation failed"})
+                return
+            finally:
+                stream.close()
+        text = "".join(pieces)
+        done = {"text": text, "pieces": len(pieces), "total_ms": round((time.perf_counter() - t0) * 1000, 2),
+                "ttft_ms": round(ttft * 1000, 2) if ttft is not None else None}
+        done["question"] = clean_followup(text)
+        yield sse("done", done)
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/tts/status/<job_id>", methods=["GET"])
+def tts_status(job_id):
+    if not re.fullmatch(r"[0-9a-f]{32}", job_id or ""):
+        return jsonify({"error": "invalid job id"}), 400
+    # ?wait=<seconds> long-polls until the job leaves "pending". Kept short
+    # (max 2 s) because each waiting client holds a sync gunicorn worker;
+    # clients poll again with a backoff instead
+    try:
+        wait = min(max(float(request.args.get("wait", 0)), 0.0), 2.0)
+    except ValueError:
+        wait = 0.0
+    state = tts_cache.wait(job_id, wait) if wait else tts_cache.status(job_id)
+    url = tts_cache.url_for(job_id) if state == "ready" else None
+    return jsonify({"job_id": job_id, "status": state, "tts_url": url})
+
+@app.route("/tts/stats", methods=["GET"])
+def tts_stats():
+    return jsonify({"cache": tts_cache.stats()})
+
+@app.route("/storage/stats", methods=["GET"])
+def storage_stats():
+    return jsonify({"media": media_janitor.stats()})
+
+@app.route("/stt/stats", methods=["GET"])
+def stt_stats():
+    cache = getattr(stt_loader.get(), "cache", None)
+    return jsonify({"cache": cache.stats() if cache else None})
+
+@app.route("/model/stats", methods=["GET"])
+def model_stats():
+    interviewer = interviewer_loader.get()
+    followups = getattr(interviewer, "followups", None)
+    return jsonify({
+        "models": interviewer.models.stats() if interviewer else None,
+        "followups": followups.stats() if followups else None,
+    })
+
 @app.route("/transcript/<session_id>", methods=["GET"])
 def transcript(session_id):
     t = get_transcript(DB_PATH, session_id)
@@ -0,0 +1,114 @@
+"""Generation throughput with and without the micro-batching scheduler.
+
+Starts 1, 4 and 16 concurrent callers that each generate ``--requests``
+completions of distinct prompts, either calling ``ModelPipeline.generate``
+directly (every call runs with batch size 1, all competing for the CPU) or
+through ``BatchScheduler``. Reports generated tokens/sec and mean latency.
+The generation cache is off so every request runs the model.
+
+``--simulate`` swaps the model for a stand-in whose forward pass costs
+``--step-ms`` per token for one sequence and 15% more per extra sequence in
+the batch, serialized like a CPU-bound model. That shows the scheduler's
+behaviour where transformers/distilgpt2 is not installed; real numbers need
+the real backend.
+
+Usage: python benchmarks/batch_bench.py [--simulate] [--requests N] [--max-length N]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.batching import BatchScheduler  # noqa: E402
+from model.pipeline import ModelPipeline  # noqa: E402
+
+PROMPT = "Interview question {i}: explain how you would design a rate limiter for a public API. Answer:"
+
+
+class SimulatedTextGeneration:
+    """Callable shaped like a transformers text-generation pipeline."""
+
+    def __init__(self, step_ms, new_tokens):
+        self.step = step_ms / 1000
+        self.new_tokens = new_tokens
+        self.cpu = threading.Lock()
+
+    def __call__(self, prompts, batch_size=1, **kwargs):
+        single = isinstance(prompts, str)
+        batch = [prompts] if single else list(prompts)
+        with self.cpu:
+            time.sleep(self.step * self.new_tokens * (1 + 0.15 * (len(batch) - 1)))
+        outs = [[{"generated_text": p + " token" * self.new_tokens}] for p in batch]
+        return outs[0] if single else outs
+
+
+def build_pipeline(args):
+    pipeline = ModelPipeline(model_dir=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                    "model", "models"), cache=False)
+    if args.simulate:
+        pipeline.model = SimulatedTextGeneration(args.step_ms, args.new_tokens)
+        pipeline.backend = "transformers"
+        pipeline.model_name = "simulated"
+    else:
+        pipeline.warm_up()
+    return pipeline
+
+
+def count_tokens(pipeline, text):
+    tokenizer = getattr(pipeline.model, "tokenizer", None)
+    return len(tokenizer.encode(text)) if tokenizer is not None else len(text.split())
+
+
+def run(generate, pipeline, callers, requests, max_length):
+    tokens = [0] * callers
+    latencies = []
+    lock = threading.Lock()
+
+    def caller(c):
+        for r in range(requests):
+            t0 = time.perf_counter()
+            text = generate(PROMPT.format(i=c * requests + r), max_length=max_length, temperature=0)
+            elapsed = time.perf_counter() - t0
+            tokens[c] += count_tokens(pipeline, text)
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=caller, args=(c,)) for c in range(callers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    return sum(tokens) / wall, sum(latencies) / len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--simulate", action="store_true")
+    parser.add_argument("--requests", type=int, default=4, help="generations per caller")
+    parser.add_argument("--max-length", type=int, default=60)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    parser.add_argument("--step-ms", type=float, default=4, help="simulated per-token cost")
+    parser.add_argument("--new-tokens", type=int, default=40, help="simulated tokens per completion")
+    args = parser.parse_args()
+
+    pipeline = build_pipeline(args)
+    if pipeline.backend != "transformers":
+        print(f"Backend is {pipeline.backend}; batching needs transformers (or use --simulate)")
+        return
+    scheduler = BatchScheduler(pipeline, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    print(f"{'callers':>7} {'direct tok/s':>13} {'batched tok/s':>14} {'direct lat s':>13} {'batched lat s':>14}")
+    for callers in (1, 4, 16):
+        direct_tps, direct_lat = run(pipeline.generate, pipeline, callers, args.requests, args.max_length)
+        batched_tps, batched_lat = run(scheduler.generate, pipeline, callers, args.requests, args.max_length)
+        print(f"{callers:>7} {direct_tps:>13.1f} {batched_tps:>14.1f} {direct_lat:>13.3f} {batched_lat:>14.3f}")
+    print(f"scheduler: {scheduler.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare fixed 30 s slicing with silence-aligned window packing.
+
+Reports Whisper windows per minute of audio and the mean RMS at window cut
+points (lower means cuts land in pauses rather than mid-word) on synthetic
+1/5/10-minute answers. With --clips DIR (audio + .txt references, as for
+stt_quant_bench.py) it also transcribes each clip both ways and reports WER.
+
+Usage: python benchmarks/chunking_bench.py [--clips DIR]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model.chunking import fixed_windows, plan_windows, window_audio  # noqa: E402
+from model.vad import detect_speech, gather_speech  # noqa: E402
+from vad_bench import SR, synthetic_answer  # noqa: E402
+
+
+def cut_rms(chunks, sr):
+    """Mean RMS of the 20 ms just before each internal window boundary."""
+    tail = int(0.02 * sr)
+    values = [float(np.sqrt(np.mean(c[-tail:] ** 2))) for c in chunks[:-1] if len(c) >= tail]
+    return float(np.mean(values)) if values else 0.0
+
+
+def compare_synthetic():
+    print(f"{'length':>7} {'fixed win/min':>14} {'packed win/min':>15} {'fixed cut rms':>14} {'packed cut rms':>15}")
+    for minutes in (1, 5, 10):
+        audio = synthetic_answer(minutes, seed=minutes)
+        vad = detect_speech(audio, SR)
+        fixed = fixed_windows(gather_speech(audio, vad), SR)
+        packed = [window_audio(audio, w) for w in plan_windows(vad, SR)]
+        print(f"{minutes:>6}m {len(fixed) / minutes:>14.2f} {len(packed) / minutes:>15.2f} "
+              f"{cut_rms(fixed, SR):>14.4f} {cut_rms(packed, SR):>15.4f}")
+
+
+def compare_clips(clip_dir):
+    from model.stt import WhisperSTT
+    from stt_quant_bench import find_clips
+    from wer import word_error_rate
+
+    clips = find_clips(clip_dir)
+    if not clips:
+        raise SystemExit(f"no audio files with .txt references in {clip_dir}")
+    print(f"\n{'mode':<8} {'mean WER':>9}   ({len(clips)} clips)")
+    for mode in ("fixed", "silence"):
+        stt = WhisperSTT(cache=False, chunking=mode)
+        if not stt.model:
+            raise SystemExit(f"could not load {stt.model_name}")
+        wers = [word_error_rate(ref, stt.transcribe_file(path) or "") for path, ref in clips]
+        print(f"{mode:<8} {np.mean(wers):>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", default=None)
+    args = parser.parse_args()
+    compare_synthetic()
+    if args.clips:
+        compare_clips(args.clips)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Per-turn database cost of /answer: rewrite, separate helpers, unit of work.
+
+"rewrite" is the original path (read the session, read the transcript, write
+the whole transcript back, insert the answer), "separate" appends turns and
+inserts the answer on their own connections, and "uow" does both in one
+transaction via ``unit_of_work``. Reports mean/p95 latency, connections and
+commits (each one a round of journal syncs) per turn on a scratch database.
+
+Usage: python benchmarks/db_turn_bench.py [--turns N] [--db PATH]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_helper import (  # noqa: E402
+    append_turns, get_session, get_transcript, init_db, reset_turns, save_answer, save_transcript, unit_of_work,
+)
+
+ANSWER = "I would use a load balancer in front of stateless services and cache hot reads."
+
+
+def turn_rows(i):
+    return [("CANDIDATE", ANSWER, 6, "Good answer."), ("INTERVIEWER", f"Question {i + 2}?", None, None)]
+
+
+def rewrite(db, sid, i):
+    get_session(db, sid)
+    transcript = get_transcript(db, sid) or ""
+    transcript += f"\nCANDIDATE: {ANSWER}\nSCORE: 6\nFEEDBACK: Good answer.\nINTERVIEWER: Question {i + 2}?"
+    save_transcript(db, sid, transcript)
+    save_answer(db, sid, ANSWER, None, 6, "Good answer.")
+    return 4, 2
+
+
+def separate(db, sid, i):
+    append_turns(db, sid, turn_rows(i))
+    save_answer(db, sid, ANSWER, None, 6, "Good answer.")
+    return 2, 2
+
+
+def uow(db, sid, i):
+    with unit_of_work(db) as u:
+        u.append_turns(sid, turn_rows(i))
+        u.save_answer(sid, ANSWER, None, 6, "Good answer.")
+    return 1, 1
+
+
+def run(name, fn, db, turns):
+    sid = f"bench-{name}"
+    save_transcript(db, sid, None, "Bench")
+    reset_turns(db, sid, [("INTERVIEWER", "Question 1?", None, None)])
+    times, connections, commits = [], 0, 0
+    for i in range(turns):
+        t0 = time.perf_counter()
+        n_conn, n_commit = fn(db, sid, i)
+        times.append(time.perf_counter() - t0)
+        connections += n_conn
+        commits += n_commit
+    times.sort()
+    mean = sum(times) / len(times) * 1000
+    p95 = times[int(len(times) * 0.95) - 1] * 1000
+    print(f"{name:>9} {mean:>9.3f} {p95:>9.3f} {connections / turns:>11.0f} {commits / turns:>13.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--db", help="scratch database (default: a temp file)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db = args.db or os.path.join(tmp, "bench.db")
+        init_db(db)
+        print(f"{'path':>9} {'mean ms':>9} {'p95 ms':>9} {'conns/turn':>11} {'commits/turn':>13}")
+        for name, fn in (("rewrite", rewrite), ("separate", separate), ("uow", uow)):
+            run(name, fn, db, args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Worker startup cost with the lazy ModelPipeline versus loading it eagerly.
+
+Each mode runs in a fresh interpreter: it imports app, waits for the
+interviewer to finish warming up and reports the import time, time to ready
+and resident memory. "eager" then calls ``pipeline.warm_up()``, which is what
+every worker used to do in ``ModelPipeline.__init__``. The
+``python -X importtime`` cost of ``model.pipeline`` and the slowest imports
+of ``app`` are listed as well.
+
+Usage: python benchmarks/startup_bench.py [--top N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import app
+imported = time.perf_counter() - t0
+app.interviewer_loader.wait(600)
+ready = time.perf_counter() - t0
+out = {"import_s": imported, "ready_s": ready}
+if sys.argv[1] == "eager":
+    t1 = time.perf_counter()
+    out["backend"] = app.interviewer_loader.get().models.warm_up()
+    out["warm_up_s"] = time.perf_counter() - t1
+else:
+    out["backend"] = app.interviewer_loader.get().pipeline.status()["backend"]
+rss = 0
+with open("/proc/self/status") as fh:
+    for line in fh:
+        if line.startswith("VmRSS:"):
+            rss = int(line.split()[1]) * 1024
+out["rss_mb"] = rss / 2 ** 20
+print(json.dumps(out))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    # Keep the comparison to model loading: no TTS pre-render or janitor threads
+    env.setdefault("TTS_PRERENDER", "0")
+    env.setdefault("MEDIA_JANITOR", "0")
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def run_mode(mode):
+    proc = subprocess.run([sys.executable, "-c", CHILD, mode], cwd=BACKEND_DIR, env=child_env(),
+                          capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"{mode} run failed:\n{proc.stderr[-2000:]}")
+
+
+def importtime(module):
+    """``(cumulative_us, name)`` per module from ``python -X importtime -c 'import <module>'``."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=BACKEND_DIR,
+                          env=child_env(), capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if sys.platform.startswith("linux"):
+        print(f"{'mode':>6} {'import s':>9} {'ready s':>8} {'warm-up s':>10} {'RSS MB':>8}  backend")
+        for mode in ("lazy", "eager"):
+            r = run_mode(mode)
+            warm = f"{r['warm_up_s']:.3f}" if "warm_up_s" in r else "-"
+            print(f"{mode:>6} {r['import_s']:>9.3f} {r['ready_s']:>8.3f} {warm:>10} {r['rss_mb']:>8.1f}  {r['backend']}")
+        print()
+
+    pipeline = [us for us, name in importtime("model.pipeline") if name == "model.pipeline"]
+    if pipeline:
+        print(f"import model.pipeline: {pipeline[0] / 1000:.1f} ms cumulative")
+    rows = importtime("app")
+    total = next((us for us, name in rows if name == "app"), None)
+    if total is not None:
+        print(f"import app: {total / 1000:.1f} ms cumulative; slowest imports:")
+    for us, name in sorted((r for r in rows if r[1] != "app"), reverse=True)[:args.top]:
+        print(f"  {us / 1000:>9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
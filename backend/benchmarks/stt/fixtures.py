@@ -0,0 +1,88 @@
+"""Deterministic audio fixtures for the STT benchmarks.
+
+Every fixture is generated from a fixed seed at 48 kHz (the browser
+MediaRecorder default), so decoders also exercise the resample to 16 kHz.
+WAV is always written with the standard library; FLAC/OGG need soundfile
+and WEBM/MP3 need ffmpeg on PATH. Containers that cannot be produced are
+reported as skipped rather than failing the run.
+"""
+import os
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+SOURCE_SR = 48000
+KINDS = ("tone", "speech", "gaps")
+CONTAINERS = ("wav", "flac", "ogg", "webm", "mp3")
+
+
+def synthesize(kind, seconds, sr=SOURCE_SR, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    t = np.arange(n, dtype=np.float32) / sr
+    if kind == "tone":
+        audio = 0.4 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * 660 * t)
+        return audio.astype(np.float32)
+
+    # Speech-like: noise shaped by a ~4 Hz syllable envelope, in bursts
+    audio = rng.normal(0, 0.003, n).astype(np.float32)
+    max_gap = 1.0 if kind == "speech" else 6.0
+    pos = 0
+    while pos < n:
+        burst = int(rng.uniform(0.6, 4.0) * sr)
+        end = min(pos + burst, n)
+        seg_t = t[: end - pos]
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 6) * seg_t))
+        carrier = rng.normal(0, 0.25, end - pos) + 0.1 * np.sin(2 * np.pi * rng.uniform(100, 250) * seg_t)
+        audio[pos:end] += (carrier * envelope).astype(np.float32)
+        pos = end + int(rng.uniform(0.1, max_gap) * sr)
+    return np.clip(audio, -1.0, 1.0)
+
+
+def _write_wav(path, audio, sr):
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm.tobytes())
+
+
+def _write_container(wav_path, path, container):
+    if container in ("flac", "ogg"):
+        import soundfile as sf
+        data, sr = sf.read(wav_path, dtype="float32")
+        sf.write(path, data, sr, format=container.upper())
+        return
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError("ffmpeg not found")
+    codec = ["-c:a", "libopus"] if container == "webm" else ["-c:a", "libmp3lame"]
+    subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", wav_path] + codec + [path],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def build_fixtures(out_dir, lengths=(10, 60, 180), kinds=KINDS, containers=CONTAINERS):
+    """Write fixtures under ``out_dir``; returns ``(fixtures, skipped)``.
+
+    Existing files are reused, so repeated runs only pay for generation once.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    fixtures, skipped = [], []
+    for kind_index, kind in enumerate(kinds):
+        for seconds in lengths:
+            stem = os.path.join(out_dir, f"{kind}_{seconds}s")
+            wav_path = stem + ".wav"
+            if not os.path.exists(wav_path):
+                _write_wav(wav_path, synthesize(kind, seconds, seed=kind_index * 1000 + seconds), SOURCE_SR)
+            for container in containers:
+                path = f"{stem}.{container}"
+                if not os.path.exists(path):
+                    try:
+                        _write_container(wav_path, path, container)
+                    except Exception as e:
+                        skipped.append({"fixture": os.path.basename(path), "reason": str(e) or type(e).__name__})
+                        continue
+                fixtures.append({"path": path, "kind": kind, "seconds": seconds, "container": container})
+    return fixtures, skipped
@@ -0,0 +1,164 @@
+"""STT benchmark suite: per-stage latency, real-time factor and peak RSS.
+
+Generates deterministic fixtures (see fixtures.py), times every decoder in
+model.audio_decode against every fixture, then runs the full
+WhisperSTT.transcribe_file path and writes a JSON report.
+
+Usage (from backend/):
+    python benchmarks/stt/run.py --stub                  # no model download, CI-friendly
+    python benchmarks/stt/run.py --lengths 10,60 --repeat 3 --out stt_report.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(HERE)))
+sys.path.insert(0, HERE)
+
+from model.audio_decode import DEFAULT_ORDER, decode_with  # noqa: E402
+from fixtures import CONTAINERS, KINDS, build_fixtures  # noqa: E402
+
+STAGES = ("decode", "resample", "vad", "chunking", "features", "generate")
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def summarize(values):
+    if not values:
+        return None
+    arr = np.asarray(values, dtype=np.float64) * 1000.0
+    return {
+        "n": len(values),
+        "mean_ms": round(float(arr.mean()), 3),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p90_ms": round(float(np.percentile(arr, 90)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+    }
+
+
+def bench_decoders(fixtures, repeat):
+    results = {}
+    for name in DEFAULT_ORDER:
+        per_container = {}
+        for container in sorted({f["container"] for f in fixtures}):
+            decode, resample, failures, error = [], [], 0, None
+            for fx in (f for f in fixtures if f["container"] == container):
+                for _ in range(repeat):
+                    t = {}
+                    try:
+                        decode_with(name, fx["path"], 16000, ext="." + container, timings=t)
+                    except Exception as e:
+                        failures += 1
+                        error = error or f"{type(e).__name__}: {e}"
+                        break
+                    decode.append(t["decode"])
+                    resample.append(t["resample"])
+            entry = {"decode": summarize(decode), "resample": summarize(resample), "failures": failures}
+            if error:
+                entry["error"] = error[:200]
+            per_container[container] = entry
+        results[name] = per_container
+    return results
+
+
+def bench_transcribe(stt, fixtures, repeat):
+    results = {}
+    for fx in fixtures:
+        stages = {s: [] for s in STAGES}
+        totals, rtfs, decoder = [], [], None
+        for _ in range(repeat):
+            t = {}
+            t0 = time.perf_counter()
+            stt.transcribe_file(fx["path"], timings=t)
+            elapsed = time.perf_counter() - t0
+            if "decode" not in t:
+                break
+            decoder = t.get("decoder")
+            for s in STAGES:
+                if s in t:
+                    stages[s].append(t[s])
+            totals.append(elapsed)
+            rtfs.append(elapsed / fx["seconds"])
+        key = f"{fx['kind']}/{fx['seconds']}s/{fx['container']}"
+        results[key] = {
+            "decoder": decoder,
+            "stages": {s: summarize(v) for s, v in stages.items() if v},
+            "total": summarize(totals),
+            "rtf_mean": round(float(np.mean(rtfs)), 5) if rtfs else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stub", action="store_true", help="use a NumPy stand-in for Whisper (no downloads)")
+    parser.add_argument("--stub-generate-ms", type=float, default=0.0, help="simulated generate() cost per window")
+    parser.add_argument("--model", default=None, help="Whisper model name when not using --stub")
+    parser.add_argument("--lengths", default="10,60,180", help="fixture lengths in seconds")
+    parser.add_argument("--kinds", default=",".join(KINDS))
+    parser.add_argument("--containers", default=",".join(CONTAINERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", default=os.path.join(tempfile.gettempdir(), "ai-interviewer-stt-fixtures"))
+    parser.add_argument("--skip-decoders", action="store_true")
+    parser.add_argument("--out", default=None, help="write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    lengths = [int(x) for x in args.lengths.split(",") if x]
+    fixtures, skipped = build_fixtures(args.fixtures, lengths=lengths,
+                                       kinds=[k for k in args.kinds.split(",") if k],
+                                       containers=[c for c in args.containers.split(",") if c])
+    rss_before = peak_rss_mb()
+
+    if args.stub:
+        from stub import StubWhisperSTT
+        stt = StubWhisperSTT(generate_ms=args.stub_generate_ms)
+    else:
+        from model.stt import WhisperSTT
+        stt = WhisperSTT(model_name=args.model, cache=False)
+        if not stt.model:
+            raise SystemExit("Whisper model could not be loaded; rerun with --stub")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model": stt.model_name,
+            "stub": bool(args.stub),
+            "device": stt.device,
+            "batch_size": stt.batch_size,
+            "chunking": stt.chunking,
+            "repeat": args.repeat,
+            "time": int(time.time()),
+        },
+        "fixtures": {"count": len(fixtures), "skipped": skipped},
+        "peak_rss_mb": {"before_model": rss_before, "after_model": peak_rss_mb()},
+    }
+    if not args.skip_decoders:
+        report["decoders"] = bench_decoders(fixtures, args.repeat)
+    report["transcribe"] = bench_transcribe(stt, fixtures, args.repeat)
+    report["peak_rss_mb"]["end"] = peak_rss_mb()
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        print(f"wrote {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
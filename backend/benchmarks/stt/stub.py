@@ -0,0 +1,39 @@
+import time
+
+import numpy as np
+
+from model.stt import WhisperSTT
+
+
+class StubWhisperSTT(WhisperSTT):
+    """WhisperSTT with the model swapped for cheap NumPy stand-ins.
+
+    Decoding, resampling, VAD and chunking run for real; feature extraction
+    is a log-power spectrogram of each padded 30 s window, and generation
+    returns a fixed string per window after an optional simulated delay.
+    Nothing is downloaded, so the benchmark suite can run in CI.
+    """
+
+    def __init__(self, generate_ms=0.0, **kwargs):
+        self.generate_ms = generate_ms
+        kwargs.setdefault("cache", False)
+        kwargs.setdefault("device", "cpu")
+        super().__init__(**kwargs)
+
+    def _init_model(self, hf_token):
+        self.model = self.processor = object()
+        self.model_name = "stub"
+
+    def _features(self, batch):
+        window = 30 * 16000
+        padded = np.zeros((len(batch), window), dtype=np.float32)
+        for i, chunk in enumerate(batch):
+            padded[i, :min(len(chunk), window)] = chunk[:window]
+        frames = padded.reshape(len(batch), 3000, 160)
+        spec = np.abs(np.fft.rfft(frames * np.hanning(160).astype(np.float32), axis=-1)) ** 2
+        return np.log10(np.maximum(spec, 1e-10))
+
+    def _generate(self, feats):
+        if self.generate_ms:
+            time.sleep(self.generate_ms / 1000.0 * len(feats))
+        return [f"window {i}" for i in range(len(feats))]
@@ -0,0 +1,121 @@
+"""Compare fp32 and dynamic-int8 Whisper on CPU: real-time factor and WER.
+
+Clips live in a local directory (default benchmarks/clips); each audio file
+needs a reference transcript next to it with the same stem and a .txt suffix:
+
+    benchmarks/clips/intro.webm
+    benchmarks/clips/intro.txt
+
+benchmarks/clips ships only the reference transcripts. A reference without
+audio is spoken to ``<stem>.wav`` with the app's pyttsx3 renderer (default
+voice, ``--rate`` words per minute), so the same engine always produces the
+same clip set; a recording saved under the same stem is used instead. The
+report records which engine and rate rendered the clips, since WER depends
+on the voice; compare fp32 and int8 within one report.
+
+Usage: python benchmarks/stt_quant_bench.py [--clips DIR] [--rate WPM] [--threads N] [--json OUT]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model.stt import WhisperSTT  # noqa: E402
+from model.tts import render_pyttsx3  # noqa: E402
+from wer import word_error_rate  # noqa: E402
+
+AUDIO_EXTS = {".wav", ".webm", ".mp3", ".ogg", ".m4a", ".flac", ".mp4"}
+
+
+def build_missing_clips(clip_dir, rate):
+    """Speak every reference that has no audio yet; returns the stems rendered."""
+    have = {os.path.splitext(n)[0] for n in os.listdir(clip_dir) if os.path.splitext(n)[1].lower() in AUDIO_EXTS}
+    built = []
+    for name in sorted(os.listdir(clip_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext != ".txt" or stem in have:
+            continue
+        with open(os.path.join(clip_dir, name), "r", encoding="utf-8") as fh:
+            text = fh.read().strip()
+        try:
+            render_pyttsx3(text, os.path.join(clip_dir, stem + ".wav"), voice=None, rate=rate)
+        except Exception as e:
+            raise SystemExit(f"could not render {stem}.wav ({e}); install pyttsx3 (and espeak on Linux) "
+                             f"or add a recording for each reference")
+        built.append(stem)
+    return built
+
+
+def find_clips(clip_dir):
+    clips = []
+    for name in sorted(os.listdir(clip_dir)):
+        stem, ext = os.path.splitext(name)
+        ref = os.path.join(clip_dir, stem + ".txt")
+        if ext.lower() in AUDIO_EXTS and os.path.exists(ref):
+            with open(ref, "r", encoding="utf-8") as fh:
+                clips.append((os.path.join(clip_dir, name), fh.read().strip()))
+    return clips
+
+
+def run_mode(mode, clips, threads, model_name):
+    stt = WhisperSTT(model_name=model_name, device="cpu", cache=False, cpu_mode=mode, num_threads=threads)
+    if not stt.model:
+        raise SystemExit(f"could not load {stt.model_name} for mode {mode}")
+    rows = []
+    for path, reference in clips:
+        audio, sr = stt._load_audio(path)
+        duration = len(audio) / float(sr) if audio is not None else 0.0
+        t0 = time.perf_counter()
+        text = stt.transcribe_file(path) or ""
+        elapsed = time.perf_counter() - t0
+        rows.append({
+            "clip": os.path.basename(path),
+            "seconds": round(duration, 2),
+            "rtf": round(elapsed / duration, 4) if duration else None,
+            "wer": round(word_error_rate(reference, text), 4),
+            "text": text,
+        })
+    total_audio = sum(r["seconds"] for r in rows)
+    total_rtf = sum((r["rtf"] or 0) * r["seconds"] for r in rows) / total_audio if total_audio else None
+    mean_wer = sum(r["wer"] for r in rows) / len(rows) if rows else None
+    return {"mode": mode, "rtf": total_rtf, "wer": mean_wer, "clips": rows}
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", default=os.path.join(here, "clips"))
+    parser.add_argument("--rate", type=int, default=150, help="speech rate for rendered clips")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--json", default=None, help="write the full report here")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.clips):
+        raise SystemExit(f"clip directory not found: {args.clips}")
+    built = build_missing_clips(args.clips, args.rate)
+    if built:
+        print(f"rendered {len(built)} clips with pyttsx3 at {args.rate} wpm")
+    clips = find_clips(args.clips)
+    if not clips:
+        raise SystemExit(f"no audio files with .txt references in {args.clips}")
+
+    modes = [run_mode(mode, clips, args.threads, args.model) for mode in ("fp32", "int8")]
+    print(f"{'mode':<6} {'RTF':>8} {'WER':>8}   ({len(clips)} clips)")
+    for r in modes:
+        print(f"{r['mode']:<6} {r['rtf']:>8.3f} {r['wer']:>8.3f}")
+    if args.json:
+        report = {"platform": platform.platform(), "processor": platform.processor(), "threads": args.threads,
+                  "clips": {"dir": args.clips, "rendered_this_run": built, "tts": "pyttsx3", "rate": args.rate},
+                  "modes": modes}
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare the vectorized VAD stage against the original per-frame loops.
+
+Usage: python benchmarks/vad_bench.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.vad import detect_speech, gather_speech  # noqa: E402
+
+SR = 16000
+
+
+def legacy_vad(audio, sr):
+    # The loop previously inlined in WhisperSTT.transcribe_file
+    frame = int(0.02 * sr)
+    if frame <= 0:
+        frame = 320
+    rms = []
+    for i in range(0, len(audio), frame):
+        seg = audio[i:i+frame]
+        if len(seg) == 0:
+            rms.append(0.0)
+        else:
+            rms.append(float(np.sqrt(np.mean(seg*seg))))
+    thr = float(np.percentile(rms, 20))
+    mask = []
+    for i in range(len(rms)):
+        mask.append(1 if rms[i] >= max(0.01, thr) else 0)
+    cleaned = []
+    for i in range(len(mask)):
+        if mask[i] == 1:
+            s = i*frame
+            e = min((i+1)*frame, len(audio))
+            cleaned.append(audio[s:e])
+    if cleaned:
+        audio = np.concatenate(cleaned)
+    return audio
+
+
+def vectorized_vad(audio, sr):
+    return gather_speech(audio, detect_speech(audio, sr))
+
+
+def synthetic_answer(minutes, seed=0):
+    """Speech-like bursts of modulated noise separated by near-silent gaps."""
+    rng = np.random.default_rng(seed)
+    n = int(minutes * 60 * SR)
+    audio = rng.normal(0, 0.002, n).astype(np.float32)
+    pos = 0
+    while pos < n:
+        burst = int(rng.uniform(0.5, 4.0) * SR)
+        gap = int(rng.uniform(0.1, 1.5) * SR)
+        end = min(pos + burst, n)
+        t = np.arange(end - pos, dtype=np.float32) / SR
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+        audio[pos:end] += (rng.normal(0, 0.3, end - pos) * envelope).astype(np.float32)
+        pos = end + gap
+    return audio / (np.max(np.abs(audio)) + 1e-8)
+
+
+def best_of(fn, audio, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(audio, SR)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'length':>8} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8} {'segments':>9} match")
+    for minutes in (1, 5, 10):
+        audio = synthetic_answer(minutes, seed=minutes)
+        t_old, out_old = best_of(legacy_vad, audio, args.repeat)
+        t_new, out_new = best_of(vectorized_vad, audio, args.repeat)
+        segments = len(detect_speech(audio, SR).segments)
+        match = out_old.shape == out_new.shape and np.array_equal(out_old, out_new)
+        print(f"{minutes:>6}m {t_old * 1000:>10.1f} {t_new * 1000:>10.1f} {t_old / t_new:>7.1f}x {segments:>9} {match}")
+
+
+if __name__ == "__main__":
+    main()
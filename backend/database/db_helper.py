@@ -1,11 +1,13 @@
 import sqlite3
 import time
 import os
+from contextlib import contextmanager
 
 
 def init_db(db_path):
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    # Every gunicorn worker runs this at boot, so wait out the others' schema writes
+    conn = sqlite3.connect(db_path, timeout=30)
     c = conn.cursor()
     # Interview tables
     c.execute("""CREATE TABLE IF NOT EXISTS sessions (
@@ -51,22 +53,36 @@ def init_db(db_path):
         score INTEGER,
         feedback TEXT
     )""")
-    # No additional tables needed for basic interviewer functionality
+    # One row per transcript line; the legacy transcript text is rebuilt on read
+    c.execute("""CREATE TABLE IF NOT EXISTS turns (
+        session_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        speaker TEXT NOT NULL,
+        text TEXT,
+        score INTEGER,
+        feedback TEXT,
+        ts REAL,
+        PRIMARY KEY (session_id, seq)
+    )""")
     conn.commit()
     conn.close()
+    migrate_transcripts_to_turns(db_path)
 
 
-def save_transcript(db_path, session_id, transcript, candidate_name=None, mobile_number=None, email=None, qualification=None, college_name=None, track=None, final_score=None):
+def save_transcript(db_path, session_id, transcript=None, candidate_name=None, mobile_number=None, email=None, qualification=None, college_name=None, track=None, final_score=None):
     conn = sqlite3.connect(db_path)
     c = conn.cursor()
     # Check if session exists
     c.execute("SELECT id FROM sessions WHERE id=?", (session_id,))
     exists = c.fetchone()
     
+    if transcript is not None:
+        # A full transcript replaces the session's turns (they are rebuilt from it on migration)
+        c.execute("DELETE FROM turns WHERE session_id=?", (session_id,))
     if exists:
         # Update existing session
         c.execute(
-            """UPDATE sessions SET transcript=?, candidate_name=COALESCE(?, candidate_name),
+            """UPDATE sessions SET transcript=COALESCE(?, transcript), candidate_name=COALESCE(?, candidate_name),
                mobile_number=COALESCE(?, mobile_number), email=COALESCE(?, email),
                qualification=COALESCE(?, qualification), college_name=COALESCE(?, college_name),
                track=COALESCE(?, track), final_score=COALESCE(?, final_score)
@@ -86,24 +102,153 @@ def save_transcript(db_path, session_id, transcript, candidate_name=None, mobile
     conn.close()
 
 
-def save_answer(db_path, session_id, answer_text, media_path, score, feedback):
-    conn = sqlite3.connect(db_path)
+def save_answer(db_path, session_id, answer_text, media_path, score, feedback, conn=None):
+    own = conn is None
+    if own:
+        conn = sqlite3.connect(db_path)
     c = conn.cursor()
     c.execute(
         "INSERT INTO answers (session_id, created_at, media_path, answer_text, score, feedback) VALUES (?, ?, ?, ?, ?, ?)",
         (session_id, time.time(), media_path or "", answer_text or "", int(score) if score is not None else None, feedback or "")
     )
-    conn.commit()
-    conn.close()
+    if own:
+        conn.commit()
+        conn.close()
 
 
 def get_transcript(db_path, session_id):
     conn = sqlite3.connect(db_path)
     c = conn.cursor()
-    c.execute("SELECT transcript FROM sessions WHERE id=?", (session_id,))
-    row = c.fetchone()
+    c.execute("SELECT speaker, text, score, feedback FROM turns WHERE session_id=? ORDER BY seq", (session_id,))
+    turns = c.fetchall()
+    if not turns:
+        # Not migrated yet (or never started)
+        c.execute("SELECT transcript FROM sessions WHERE id=?", (session_id,))
+        row = c.fetchone()
+        conn.close()
+        return row[0] if row else None
+    conn.close()
+    return render_transcript(turns)
+
+
+def render_transcript(turns):
+    """Legacy transcript text for ``(speaker, text, score, feedback)`` rows.
+
+    A candidate turn's SCORE/FEEDBACK lines follow the interviewer line (or
+    INTERVIEW COMPLETE) that comes after it, as the old text blob had them.
+    """
+    lines = []
+    pending = None
+    for speaker, text, score, feedback in turns:
+        lines.append(text if speaker == "SYSTEM" else f"{speaker}: {text}")
+        if pending:
+            lines.extend(pending)
+            pending = None
+        if speaker == "CANDIDATE" and (score is not None or feedback is not None):
+            pending = [f"SCORE: {score}", f"FEEDBACK: {feedback}"]
+    if pending:
+        lines.extend(pending)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def append_turns(db_path, session_id, turns, conn=None):
+    """Append ``(speaker, text, score, feedback)`` rows after the session's last turn."""
+    own = conn is None
+    if own:
+        conn = sqlite3.connect(db_path, timeout=10)
+    c = conn.cursor()
+    now = time.time()
+    for speaker, text, score, feedback in turns:
+        # seq is taken under the write lock the INSERT holds, so concurrent appends cannot collide
+        c.execute(
+            """INSERT INTO turns (session_id, seq, speaker, text, score, feedback, ts)
+               SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ?, ?, ? FROM turns WHERE session_id=?""",
+            (session_id, speaker, text or "", int(score) if score is not None else None, feedback, now, session_id)
+        )
+    if own:
+        conn.commit()
+        conn.close()
+
+
+def reset_turns(db_path, session_id, turns=()):
+    """Replace every turn of a session, e.g. when an interview is (re)started."""
+    conn = sqlite3.connect(db_path, timeout=10)
+    c = conn.cursor()
+    c.execute("DELETE FROM turns WHERE session_id=?", (session_id,))
+    now = time.time()
+    c.executemany(
+        "INSERT INTO turns (session_id, seq, speaker, text, score, feedback, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(session_id, i, speaker, text or "", int(score) if score is not None else None, feedback, now)
+         for i, (speaker, text, score, feedback) in enumerate(turns, start=1)]
+    )
+    c.execute("UPDATE sessions SET transcript=NULL WHERE id=?", (session_id,))
+    conn.commit()
     conn.close()
-    return row[0] if row else None
+
+
+def parse_transcript(text):
+    """Split a legacy transcript blob into turn rows, or None if it would not round-trip."""
+    body = text[:-1] if text.endswith("\n") else text
+    turns = []
+    candidate = None
+    tail = None  # [turn, field index] that continuation lines belong to
+    for line in body.split("\n"):
+        if line.startswith("INTERVIEWER: ") or line.startswith("CANDIDATE: "):
+            speaker, said = line.split(": ", 1)
+            turns.append([speaker, said, None, None])
+            candidate = turns[-1] if speaker == "CANDIDATE" else candidate
+            tail = [turns[-1], 1]
+        elif line == "INTERVIEW COMPLETE":
+            turns.append(["SYSTEM", line, None, None])
+            tail = None
+        elif line.startswith("SCORE: ") and candidate is not None and candidate[2] is None:
+            raw = line[len("SCORE: "):]
+            candidate[2] = None if raw == "None" else int(raw) if raw.lstrip("-").isdigit() else raw
+            tail = None
+        elif line.startswith("FEEDBACK: ") and candidate is not None and candidate[3] is None:
+            candidate[3] = line[len("FEEDBACK: "):]
+            tail = [candidate, 3]
+        elif tail is not None:
+            # Multi-line answers and feedback
+            tail[0][tail[1]] += "\n" + line
+        else:
+            return None
+    turns = [tuple(t) for t in turns]
+    return turns if render_transcript(turns) == text else None
+
+
+def migrate_transcripts_to_turns(db_path):
+    """Split every stored transcript blob into ``turns``; returns how many sessions moved.
+
+    Blobs that do not parse exactly are kept verbatim as a single SYSTEM turn.
+    The blob itself stays in ``sessions.transcript`` so the migration can be
+    rolled back; reads prefer the turns once a session has any.
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    c = conn.cursor()
+    try:
+        # Workers boot together: take the write lock before choosing sessions so
+        # only one of them migrates and the rest find nothing left to do
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("""SELECT id, transcript FROM sessions WHERE transcript IS NOT NULL AND transcript != ''
+                     AND id NOT IN (SELECT DISTINCT session_id FROM turns)""")
+        rows = c.fetchall()
+        now = time.time()
+        for session_id, text in rows:
+            turns = parse_transcript(text) or [("SYSTEM", text[:-1] if text.endswith("\n") else text, None, None)]
+            c.executemany(
+                "INSERT OR IGNORE INTO turns (session_id, seq, speaker, text, score, feedback, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(session_id, i, *turn, now) for i, turn in enumerate(turns, start=1)]
+            )
+        c.execute("COMMIT")
+    except Exception:
+        # BEGIN IMMEDIATE itself may have failed (still locked after the timeout)
+        if conn.in_transaction:
+            c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return len(rows)
 
 # No funnel helpers needed for basic interviewer functionality
 
@@ -129,20 +274,27 @@ def list_sessions(db_path):
     } for r in rows]
 
 
-def get_session(db_path, session_id):
-    conn = sqlite3.connect(db_path)
+def get_session(db_path, session_id, conn=None):
+    own = conn is None
+    if own:
+        conn = sqlite3.connect(db_path)
     c = conn.cursor()
     c.execute("""SELECT id, created_at, candidate_name, transcript, mobile_number, email,
                  qualification, college_name, track, final_score
                  FROM sessions WHERE id=?""", (session_id,))
     row = c.fetchone()
-    conn.close()
+    turns = None
+    if row:
+        c.execute("SELECT speaker, text, score, feedback FROM turns WHERE session_id=? ORDER BY seq", (session_id,))
+        turns = c.fetchall()
+    if own:
+        conn.close()
     if row:
         return {
             "id": row[0], 
             "created_at": row[1], 
             "candidate_name": row[2], 
-            "transcript": row[3],
+            "transcript": render_transcript(turns) if turns else row[3],
             "mobile_number": row[4],
             "email": row[5],
             "qualification": row[6],
@@ -153,6 +305,55 @@ def get_session(db_path, session_id):
     return None
 
 
+class UnitOfWork:
+    """Helpers bound to one connection; see ``unit_of_work``.
+
+    ``seconds`` is the wall time spent in database calls and the final commit.
+    """
+
+    def __init__(self, db_path, conn):
+        self.db_path = db_path
+        self.conn = conn
+        self.seconds = 0.0
+        self.calls = 0
+
+    def _timed(self, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(self.db_path, *args, conn=self.conn, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - t0
+            self.calls += 1
+
+    def append_turns(self, session_id, turns):
+        return self._timed(append_turns, session_id, turns)
+
+    def save_answer(self, session_id, answer_text, media_path, score, feedback):
+        return self._timed(save_answer, session_id, answer_text, media_path, score, feedback)
+
+
+@contextmanager
+def unit_of_work(db_path):
+    """Run several helpers on one connection and commit them as one transaction.
+
+    Rolls back everything if the block raises.
+    """
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(db_path, timeout=10)
+    uow = UnitOfWork(db_path, conn)
+    uow.seconds = time.perf_counter() - t0
+    try:
+        yield uow
+        t1 = time.perf_counter()
+        conn.commit()
+        uow.seconds += time.perf_counter() - t1
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
 def get_answers_for_session(db_path, session_id):
     conn = sqlite3.connect(db_path)
     c = conn.cursor()
@@ -3,3 +3,14 @@ CREATE TABLE IF NOT EXISTS sessions (
     created_at REAL,
     transcript TEXT
 );
+
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    speaker TEXT NOT NULL,
+    text TEXT,
+    score INTEGER,
+    feedback TEXT,
+    ts REAL,
+    PRIMARY KEY (session_id, seq)
+);
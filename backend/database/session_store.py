@@ -0,0 +1,248 @@
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SESSION_DB = os.path.join(BASE_DIR, "sessions.db")
+
+
+class SessionConflict(Exception):
+    """Raised by ``put`` when the stored version moved since it was read."""
+
+
+class InMemorySessionStore:
+    """Interview state for a single process (SESSION_STORE=memory).
+
+    Same contract as ``SQLiteSessionStore``: ``get`` returns ``(state,
+    version)`` and ``put`` only succeeds against the version that was read.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = float(ttl or os.getenv("SESSION_TTL", 6 * 3600))
+        self._lock = threading.Lock()
+        self._items = {}
+        self.counters = {"reads": 0, "writes": 0, "conflicts": 0, "expired": 0}
+
+    def get(self, session_id):
+        with self._lock:
+            self.counters["reads"] += 1
+            item = self._items.get(session_id)
+            if item is None:
+                return None, 0
+            state, version, expires_at = item
+            if expires_at < time.time():
+                del self._items[session_id]
+                self.counters["expired"] += 1
+                return None, 0
+            return copy.deepcopy(state), version
+
+    def put(self, session_id, state, version=0):
+        """Store ``state`` if the current version is still ``version``; returns the new version.
+
+        Pass ``version=None`` to overwrite unconditionally (a fresh interview).
+        """
+        with self._lock:
+            item = self._items.get(session_id)
+            current = item[1] if item and item[2] >= time.time() else 0
+            if version is not None and version != current:
+                self.counters["conflicts"] += 1
+                raise SessionConflict(f"session {session_id} is at version {current}, not {version}")
+            self._items[session_id] = (copy.deepcopy(state), current + 1, time.time() + self.ttl)
+            self.counters["writes"] += 1
+            return current + 1
+
+    def invalidate(self, session_id):
+        pass
+
+    def delete(self, session_id):
+        with self._lock:
+            self._items.pop(session_id, None)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            dead = [sid for sid, (_, _, expires_at) in self._items.items() if expires_at < now]
+            for sid in dead:
+                del self._items[sid]
+            self.counters["expired"] += len(dead)
+        return len(dead)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+            out["sessions"] = len(self._items)
+        out["backend"] = "memory"
+        return out
+
+
+class SQLiteSessionStore:
+    """Interview state shared by every worker through one SQLite file in WAL mode.
+
+    Each row carries a version that ``put`` compares-and-swaps, so two
+    workers updating the same interview cannot silently overwrite each
+    other. Rows expire ``ttl`` seconds after their last write. Every worker
+    keeps an LRU of recently read states; ``get`` trusts an entry only after
+    a one-column read confirms its version is still current, which skips
+    the JSON decode but never hands back state another worker replaced.
+    """
+
+    def __init__(self, db_path=None, ttl=None, cache_items=None):
+        self.db_path = db_path or os.getenv("SESSION_DB") or DEFAULT_SESSION_DB
+        self.ttl = float(ttl or os.getenv("SESSION_TTL", 6 * 3600))
+        self.cache_items = int(cache_items if cache_items is not None else os.getenv("SESSION_CACHE_ITEMS", 1024))
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._writes_since_purge = 0
+        self.counters = {"cache_hits": 0, "stale": 0, "reads": 0, "writes": 0, "conflicts": 0, "expired": 0}
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS session_state (
+            id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_session_state_expires ON session_state(expires_at)")
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _remember(self, session_id, state, version, expires_at):
+        if self.cache_items <= 0:
+            return
+        with self._lock:
+            self._cache[session_id] = (state, version, expires_at)
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_items:
+                self._cache.popitem(last=False)
+
+    def get(self, session_id):
+        now = time.time()
+        with self._lock:
+            item = self._cache.get(session_id)
+        conn = self._connect()
+        try:
+            if item is not None:
+                row = conn.execute("SELECT version, expires_at FROM session_state WHERE id=?",
+                                   (session_id,)).fetchone()
+                if row is not None and row[0] == item[1] and row[1] >= now:
+                    with self._lock:
+                        if session_id in self._cache:
+                            self._cache.move_to_end(session_id)
+                        self.counters["cache_hits"] += 1
+                    return copy.deepcopy(item[0]), item[1]
+                # Another worker wrote it since (or it expired)
+                self.invalidate(session_id)
+                self._count("stale")
+            self._count("reads")
+            row = conn.execute("SELECT state, version, expires_at FROM session_state WHERE id=?",
+                               (session_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None or row[2] < now:
+            return None, 0
+        state = json.loads(row[0])
+        self._remember(session_id, state, row[1], row[2])
+        return copy.deepcopy(state), row[1]
+
+    def put(self, session_id, state, version=0):
+        """Store ``state`` if the current version is still ``version``; returns the new version.
+
+        Pass ``version=None`` to overwrite unconditionally (a fresh interview).
+        An expired row counts as version 0.
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        payload = json.dumps(state)
+        conn = self._connect()
+        try:
+            if version is None:
+                row = conn.execute("SELECT version, expires_at FROM session_state WHERE id=?",
+                                   (session_id,)).fetchone()
+                new_version = (row[0] if row and row[1] >= now else 0) + 1
+                conn.execute("INSERT OR REPLACE INTO session_state (id, version, state, expires_at) VALUES (?, ?, ?, ?)",
+                             (session_id, new_version, payload, expires_at))
+            elif version == 0:
+                new_version = 1
+                # Absent or expired rows may be claimed; a live row means someone else started it
+                cur = conn.execute(
+                    """INSERT INTO session_state (id, version, state, expires_at) VALUES (?, 1, ?, ?)
+                       ON CONFLICT(id) DO UPDATE SET version=1, state=excluded.state, expires_at=excluded.expires_at
+                       WHERE session_state.expires_at < ?""",
+                    (session_id, payload, expires_at, now))
+                if cur.rowcount == 0:
+                    raise SessionConflict(f"session {session_id} already exists")
+            else:
+                new_version = version + 1
+                cur = conn.execute(
+                    "UPDATE session_state SET version=?, state=?, expires_at=? WHERE id=? AND version=? AND expires_at>=?",
+                    (new_version, payload, expires_at, session_id, version, now))
+                if cur.rowcount == 0:
+                    raise SessionConflict(f"session {session_id} changed since version {version}")
+            conn.commit()
+        except SessionConflict:
+            conn.rollback()
+            self.invalidate(session_id)
+            self._count("conflicts")
+            raise
+        finally:
+            conn.close()
+        self._count("writes")
+        self._remember(session_id, copy.deepcopy(state), new_version, expires_at)
+        with self._lock:
+            self._writes_since_purge += 1
+            purge = self._writes_since_purge >= 500
+            if purge:
+                self._writes_since_purge = 0
+        if purge:
+            self.purge_expired()
+        return new_version
+
+    def invalidate(self, session_id):
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def delete(self, session_id):
+        self.invalidate(session_id)
+        conn = self._connect()
+        conn.execute("DELETE FROM session_state WHERE id=?", (session_id,))
+        conn.commit()
+        conn.close()
+
+    def purge_expired(self):
+        conn = self._connect()
+        cur = conn.execute("DELETE FROM session_state WHERE expires_at<?", (time.time(),))
+        conn.commit()
+        conn.close()
+        self._count("expired", cur.rowcount)
+        return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+            out["cached"] = len(self._cache)
+        reads = out["cache_hits"] + out["reads"]
+        out["cache_hit_rate"] = round(out["cache_hits"] / reads, 4) if reads else 0.0
+        out["backend"] = "sqlite"
+        return out
+
+
+def create_session_store():
+    # sqlite (default) is shared by every gunicorn worker on the host;
+    # memory keeps state inside one process, as before
+    if os.getenv("SESSION_STORE", "sqlite").lower() == "memory":
+        return InMemorySessionStore()
+    return SQLiteSessionStore()
@@ -0,0 +1,220 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+# extension -> name of the decoder that last succeeded for it
+_DECODER_MEMO = {}
+
+
+def _ext_of(path):
+    return os.path.splitext(path or "")[1].lower() or "<none>"
+
+
+def _is_path(src):
+    return isinstance(src, (str, os.PathLike))
+
+
+def _file_like(src):
+    """Decoders accept a path or an in-memory buffer; give them something seekable."""
+    return src if _is_path(src) else io.BytesIO(src)
+
+
+@contextmanager
+def _as_path(src, ext):
+    """Yield a filesystem path for ``src``, spilling bytes to a temp file only when needed."""
+    if _is_path(src):
+        yield src
+        return
+    fd, tmp = tempfile.mkstemp(suffix=ext if ext != "<none>" else "")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(src)
+        yield tmp
+    finally:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+
+
+def _to_mono(data):
+    if isinstance(data, np.ndarray) and data.ndim == 2:
+        data = data.mean(axis=1)
+    return data
+
+
+@lru_cache(maxsize=8)
+def _torchaudio_resampler(orig_freq, new_freq):
+    import torchaudio
+    return torchaudio.transforms.Resample(orig_freq=orig_freq, new_freq=new_freq)
+
+
+def resample(data, orig_sr, target_sr):
+    """Resample with a cached torchaudio kernel, falling back to resampy."""
+    if orig_sr == target_sr:
+        return data
+    try:
+        import torch
+        waveform = torch.from_numpy(np.ascontiguousarray(data, dtype=np.float32)).unsqueeze(0)
+        return _torchaudio_resampler(orig_sr, target_sr)(waveform).squeeze(0).numpy()
+    except ImportError:
+        pass
+    import resampy
+    return np.asarray(resampy.resample(data, orig_sr, target_sr), dtype=np.float32)
+
+
+# Decoders return (mono float32 audio, native sample rate); _decode resamples.
+def decode_ffmpeg_pipe(src, target_sr, ext=None):
+    """Decode to mono float32 PCM at ``target_sr`` straight from ffmpeg's stdout.
+
+    Paths are passed to ffmpeg directly; in-memory uploads are fed through stdin.
+    """
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError("ffmpeg not found")
+    cmd = ["ffmpeg", "-loglevel", "error"]
+    if _is_path(src):
+        cmd += ["-nostdin", "-i", os.fspath(src)]
+    else:
+        cmd += ["-i", "pipe:0"]
+    cmd += ["-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(target_sr), "-"]
+    proc = subprocess.run(
+        cmd, input=None if _is_path(src) else src,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        raise RuntimeError("ffmpeg decode failed")
+    return np.frombuffer(proc.stdout, dtype=np.float32), target_sr
+
+
+def decode_torchaudio(src, target_sr, ext=None):
+    import torchaudio
+    waveform, sample_rate = torchaudio.load(_file_like(src))
+    if waveform.shape[0] > 1:
+        waveform = waveform.mean(dim=0, keepdim=True)
+    return waveform.squeeze(0).numpy(), sample_rate
+
+
+def decode_av(src, target_sr, ext=None):
+    import av
+    container = av.open(_file_like(src))
+    try:
+        stream = next((s for s in container.streams if s.type == 'audio'), None)
+        if stream is None:
+            raise RuntimeError('no audio stream')
+        frames = []
+        for frame in container.decode(stream):
+            samples = frame.to_ndarray()
+            if samples.ndim == 2:
+                samples = samples.mean(axis=0)
+            if samples.dtype.kind in 'iu':
+                samples = samples.astype(np.float32) / np.iinfo(samples.dtype).max
+            else:
+                samples = samples.astype(np.float32)
+            frames.append(samples)
+    finally:
+        container.close()
+    if not frames:
+        raise RuntimeError('no audio frames')
+    return np.concatenate(frames), stream.rate or target_sr
+
+
+def decode_soundfile(src, target_sr, ext=None):
+    import soundfile as sf
+    data, sample_rate = sf.read(_file_like(src), always_2d=False)
+    return np.asarray(_to_mono(data), dtype=np.float32), sample_rate
+
+
+def decode_moviepy(src, target_sr, ext=None):
+    from moviepy.editor import AudioFileClip
+    import soundfile as sf
+    tmpwav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    tmpwav.close()
+    try:
+        # moviepy only reads from a path
+        with _as_path(src, ext or "<none>") as path:
+            clip = AudioFileClip(path)
+            clip.write_audiofile(tmpwav.name, fps=target_sr, nbytes=2, verbose=False, logger=None)
+            clip.close()
+        data, sample_rate = sf.read(tmpwav.name, always_2d=False)
+    finally:
+        try:
+            os.remove(tmpwav.name)
+        except Exception:
+            pass
+    return np.asarray(_to_mono(data), dtype=np.float32), sample_rate
+
+
+DECODERS = {
+    "ffmpeg_pipe": decode_ffmpeg_pipe,
+    "torchaudio": decode_torchaudio,
+    "av": decode_av,
+    "soundfile": decode_soundfile,
+    "moviepy": decode_moviepy,
+}
+DEFAULT_ORDER = ("ffmpeg_pipe", "torchaudio", "av", "soundfile", "moviepy")
+
+
+def decoder_order(ext):
+    """Decoder names to try for ``ext``, the last one that worked first."""
+    remembered = _DECODER_MEMO.get(ext)
+    if remembered:
+        return (remembered,) + tuple(n for n in DEFAULT_ORDER if n != remembered)
+    return DEFAULT_ORDER
+
+
+def decode_with(name, src, target_sr=16000, ext=None, timings=None):
+    """Run a single named decoder plus resampling; raises if it cannot handle ``src``.
+
+    ``timings``, if given, receives ``decode`` and ``resample`` seconds.
+    """
+    t0 = time.perf_counter()
+    arr, sr = DECODERS[name](src, target_sr, ext=ext)
+    if arr is None or len(arr) == 0:
+        raise RuntimeError(f"{name} produced no audio")
+    t1 = time.perf_counter()
+    arr = resample(arr, sr, target_sr)
+    if timings is not None:
+        timings["decode"] = t1 - t0
+        timings["resample"] = time.perf_counter() - t1
+        timings["decoder"] = name
+    return arr, target_sr
+
+
+def _decode(src, ext, target_sr, timings=None):
+    for name in decoder_order(ext):
+        try:
+            arr, sr = decode_with(name, src, target_sr, ext=ext, timings=timings)
+        except Exception:
+            continue
+        _DECODER_MEMO[ext] = name
+        return arr, sr
+    _DECODER_MEMO.pop(ext, None)
+    return None, None
+
+
+def load_audio(path, target_sr=16000, timings=None):
+    """Decode ``path`` to a mono float32 array, returning ``(audio, sr)`` or ``(None, None)``."""
+    return _decode(path, _ext_of(path), target_sr, timings=timings)
+
+
+def load_audio_bytes(data, ext=None, target_sr=16000, timings=None):
+    """Decode an in-memory upload (bytes, bytearray or memoryview) without touching disk.
+
+    ``ext`` (e.g. ``".webm"``) selects the remembered decoder; only decoders that
+    need a real path write a temp file.
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if not data:
+        return None, None
+    ext = (ext or "").lower()
+    if ext and not ext.startswith("."):
+        ext = "." + ext
+    return _decode(bytes(data), ext or "<none>", target_sr, timings=timings)
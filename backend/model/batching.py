@@ -0,0 +1,121 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _Request:
+    __slots__ = ("prompt", "params", "stop_event", "future")
+
+    def __init__(self, prompt, params, stop_event):
+        self.prompt = prompt
+        self.params = params
+        self.stop_event = stop_event
+        self.future = Future()
+
+
+class BatchScheduler:
+    """Collects concurrent ``generate`` calls into batches for one ModelPipeline.
+
+    One thread drains the queue: it takes the first waiting request, keeps
+    collecting for up to ``max_wait_ms`` (or until ``max_batch`` requests),
+    then runs requests with the same length and sampling parameters as one
+    ``generate_batch`` call. Each caller gets its own result through a
+    future. Only the transformers backend batches; with any other backend
+    requests run one at a time without waiting. Streams and direct
+    ``generate`` calls bypass the queue; the pipeline's run lock keeps them
+    from entering the model while a batch is running.
+    """
+
+    def __init__(self, pipeline, max_batch=None, max_wait_ms=None):
+        self.pipeline = pipeline
+        self.max_batch = max(1, int(max_batch or os.getenv("GEN_BATCH_MAX", 8)))
+        self.max_wait = float(max_wait_ms if max_wait_ms is not None else os.getenv("GEN_BATCH_WAIT_MS", 5)) / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "batches": 0, "batched_requests": 0, "largest_batch": 0,
+                         "skipped": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._serve, name="generate-batcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def backend(self):
+        return self.pipeline.backend
+
+    def submit(self, prompt, max_length=120, stop_event=None, temperature=None, top_k=None, top_p=None):
+        """Queue a generation; returns a Future with the generated text."""
+        params = (max_length, temperature, top_k, top_p)
+        req = _Request(prompt, params, stop_event)
+        with self._lock:
+            self.counters["requests"] += 1
+        self._queue.put(req)
+        return req.future
+
+    def generate(self, prompt, max_length=120, stop_event=None, temperature=None, top_k=None, top_p=None):
+        return self.submit(prompt, max_length, stop_event, temperature, top_k, top_p).result()
+
+    def _collect(self, first):
+        batch = [first]
+        if self.max_batch == 1 or self.pipeline.warm_up() != "transformers":
+            return batch
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _serve(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            groups = {}
+            for req in self._collect(first):
+                if req is None:
+                    self._queue.put(None)
+                    continue
+                # Cancelled before it ran: no need to generate
+                if req.stop_event is not None and req.stop_event.is_set():
+                    req.future.set_result("")
+                    with self._lock:
+                        self.counters["skipped"] += 1
+                    continue
+                groups.setdefault(req.params, []).append(req)
+            for params, reqs in groups.items():
+                self._run(params, reqs)
+
+    def _run(self, params, reqs):
+        max_length, temperature, top_k, top_p = params
+        try:
+            texts = self.pipeline.generate_batch([r.prompt for r in reqs], max_length=max_length,
+                                                 stop_events=[r.stop_event for r in reqs],
+                                                 temperature=temperature, top_k=top_k, top_p=top_p)
+        except Exception as e:
+            with self._lock:
+                self.counters["errors"] += 1
+            for r in reqs:
+                r.future.set_exception(e)
+            return
+        for r, text in zip(reqs, texts):
+            r.future.set_result(text)
+        with self._lock:
+            self.counters["batches"] += 1
+            self.counters["batched_requests"] += len(reqs)
+            self.counters["largest_batch"] = max(self.counters["largest_batch"], len(reqs))
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+        out["mean_batch"] = round(out["batched_requests"] / out["batches"], 2) if out["batches"] else 0.0
+        out["queued"] = self._queue.qsize()
+        out.update({"max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000})
+        return out
+
+    def close(self):
+        self._queue.put(None)
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def _merge_segments(segments, gap, pad, num_samples):
+    """Pad segments and join those separated by less than ``gap`` samples."""
+    merged = []
+    for s, e in segments:
+        s, e = max(0, s - pad), min(num_samples, e + pad)
+        if merged and s - merged[-1][1] < gap:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return [(s, e) for s, e in merged]
+
+
+def _quietest_cut(vad, lo, hi):
+    """Sample offset of the lowest-RMS frame whose start lies in ``[lo, hi)``."""
+    f_lo = max(0, -(-lo // vad.frame))
+    f_hi = min(len(vad.rms), max(f_lo + 1, hi // vad.frame))
+    if f_lo >= f_hi:
+        return hi
+    i = f_lo + int(np.argmin(vad.rms[f_lo:f_hi]))
+    return min(hi, i * vad.frame + vad.frame // 2)
+
+
+def plan_windows(vad, sr, window_s=30.0, search_s=2.0, merge_gap_s=0.0, pad_s=0.0):
+    """Pack speech segments into Whisper-sized windows with cuts in quiet frames.
+
+    Returns a list of windows, each a list of ``(start, end)`` sample ranges of
+    the original signal whose concatenation is at most ``window_s`` long.
+    Segments are packed in order so text can be joined window by window. When
+    the next segment does not fit, the window is closed at the pause before it
+    if that is within ``search_s`` of the edge; otherwise the segment is split
+    at its quietest frame in that final stretch instead of at the edge itself.
+    ``merge_gap_s``/``pad_s`` keep short pauses and word edges around speech,
+    at the cost of more audio (and so more windows) reaching the model.
+    """
+    limit = int(window_s * sr)
+    search = int(search_s * sr)
+    segments = vad.segments or ([(0, vad.num_samples)] if vad.num_samples else [])
+    segments = _merge_segments(segments, int(merge_gap_s * sr), int(pad_s * sr), vad.num_samples)
+
+    windows = []
+    current, used = [], 0
+    for s, e in segments:
+        while s < e:
+            room = limit - used
+            if e - s <= room:
+                current.append((s, e))
+                used += e - s
+                break
+            if room > search:
+                cut = _quietest_cut(vad, s + max(1, room - search), s + room)
+                current.append((s, cut))
+                s = cut
+            windows.append(current)
+            current, used = [], 0
+    if current:
+        windows.append(current)
+    return windows
+
+
+def window_audio(audio, window):
+    if len(window) == 1:
+        s, e = window[0]
+        return audio[s:e]
+    return np.concatenate([audio[s:e] for s, e in window])
+
+
+def fixed_windows(audio, sr, window_s=30.0):
+    """Slice already-gathered speech into back-to-back ``window_s`` chunks."""
+    chunk_len = int(window_s * sr)
+    chunks = [audio[j:j+chunk_len] for j in range(0, len(audio), chunk_len)]
+    return [c for c in chunks if len(c)]
@@ -0,0 +1,158 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PROMPT = (
+    "You are interviewing a candidate for a {role} role. You just asked:\n"
+    "\"{question}\"\n"
+    "Write one short follow-up question that probes deeper into the same topic.\n"
+    "Follow-up question:"
+)
+
+
+def clean_followup(text):
+    """First usable question in the model output, or None."""
+    for line in (text or "").splitlines():
+        line = re.sub(r"^\s*(follow-up question:|q:|[-*\d.)\s]+)", "", line, flags=re.I).strip().strip('"')
+        if not line:
+            continue
+        if "?" in line:
+            line = line[:line.index("?") + 1]
+        if 10 <= len(line) <= 200 and line.endswith("?"):
+            return line
+        return None
+    return None
+
+
+class _Job:
+    __slots__ = ("key", "future", "stop")
+
+    def __init__(self, key, future, stop):
+        self.key = key
+        self.future = future
+        self.stop = stop
+
+
+class FollowUpGenerator:
+    """Generates a follow-up for the question a candidate is answering.
+
+    ``prefetch`` starts generation in the background when a question is
+    sent; ``take`` returns the follow-up only if it already finished and
+    never waits. Each session has at most one job: a new question, ``take``
+    or ``discard`` cancels the previous one (a running generation is asked
+    to stop at its next token). At most ``max_in_flight`` generations are
+    queued or running per worker; beyond that new prefetches are dropped.
+    """
+
+    def __init__(self, models, max_in_flight=None, max_tokens=None, max_sessions=None, temperature=None):
+        # A ModelRegistry: drafts run on the model configured for the interview's track
+        self.models = models
+        self.max_in_flight = int(max_in_flight or os.getenv("FOLLOWUP_MAX_INFLIGHT", 2))
+        self.max_tokens = int(max_tokens or os.getenv("FOLLOWUP_MAX_TOKENS", 48))
+        self.max_sessions = int(max_sessions or os.getenv("FOLLOWUP_MAX_SESSIONS", 256))
+        # Greedy by default: the same question and role always draft the same
+        # follow-up, so the pipeline's generation cache answers repeats
+        self.temperature = float(temperature if temperature is not None else os.getenv("FOLLOWUP_TEMPERATURE", 0))
+        # With batched generation every in-flight draft waits on the model at
+        # once so they can share a batch; otherwise one model thread per worker
+        workers = self.max_in_flight if getattr(models, "batching", False) else 1
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="followup")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._in_flight = 0
+        self.counters = {"started": 0, "completed": 0, "used": 0, "not_ready": 0,
+                         "cancelled": 0, "dropped": 0, "failed": 0, "rejected": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def prefetch(self, session_id, key, question, role="Software Engineer"):
+        """Start generating a follow-up to ``question``; ``key`` identifies it for ``take``."""
+        self.discard(session_id)
+        stop = threading.Event()
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.counters["dropped"] += 1
+                return False
+            self._in_flight += 1
+            self.counters["started"] += 1
+        prompt = PROMPT.format(role=role, question=question)
+        future = self._executor.submit(self._generate, prompt, role, stop)
+        future.add_done_callback(self._finished)
+        job = _Job(key, future, stop)
+        evicted = []
+        with self._lock:
+            self._jobs[session_id] = job
+            while len(self._jobs) > self.max_sessions:
+                evicted.append(self._jobs.popitem(last=False)[1])
+        for old in evicted:
+            self._cancel(old)
+        return True
+
+    def _generate(self, prompt, role, stop):
+        if stop.is_set():
+            return None
+        return clean_followup(self.models.generate(prompt, track=role, max_length=self.max_tokens, stop_event=stop,
+                                                   temperature=self.temperature))
+
+    def _finished(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            print(f"Follow-up generation failed: {future.exception()}")
+            self._count("failed")
+        else:
+            self._count("completed")
+
+    def _cancel(self, job):
+        if job.future.done():
+            return
+        job.stop.set()
+        job.future.cancel()
+        self._count("cancelled")
+
+    def take(self, session_id, key):
+        """The finished follow-up for ``key``, or None without waiting."""
+        with self._lock:
+            job = self._jobs.pop(session_id, None)
+        if job is None:
+            return None
+        if job.key != key:
+            self._cancel(job)
+            return None
+        if not job.future.done():
+            self._cancel(job)
+            self._count("not_ready")
+            return None
+        if job.future.cancelled() or job.future.exception() is not None:
+            return None
+        text = job.future.result()
+        self._count("used" if text else "rejected")
+        return text
+
+    def discard(self, session_id):
+        with self._lock:
+            job = self._jobs.pop(session_id, None)
+        if job is not None:
+            self._cancel(job)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+            out["in_flight"] = self._in_flight
+            out["sessions"] = len(self._jobs)
+        out["max_in_flight"] = self.max_in_flight
+        return out
+
+    def close(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            self._cancel(job)
+        self._executor.shutdown(wait=False)
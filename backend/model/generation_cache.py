@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class GenerationCache:
+    """Cache of ``ModelPipeline.generate`` results: an in-process LRU, optionally backed by SQLite.
+
+    Keys hash the backend, model, prompt, length and sampling parameters;
+    ``key`` returns None for sampled (temperature > 0 or backend default)
+    generations, which are never cached. Entries expire ``ttl`` seconds after
+    they were stored. The SQLite tier (``db_path`` / GEN_CACHE_DB) is shared
+    by every worker on the host and trimmed oldest-first to ``max_rows``.
+    """
+
+    def __init__(self, max_items=None, ttl=None, db_path=None, max_rows=None):
+        self.max_items = int(max_items if max_items is not None else os.getenv("GEN_CACHE_ITEMS", 512))
+        self.ttl = float(ttl if ttl is not None else os.getenv("GEN_CACHE_TTL", 7 * 24 * 3600))
+        self.db_path = db_path or os.getenv("GEN_CACHE_DB") or None
+        self.max_rows = int(max_rows if max_rows is not None else os.getenv("GEN_CACHE_DB_ROWS", 10000))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_trim = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+                         "uncacheable": 0, "expired": 0, "evictions": 0}
+        if self.db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                conn = self._connect()
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""CREATE TABLE IF NOT EXISTS generations (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )""")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_created ON generations(created_at)")
+                conn.commit()
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Generation cache database unavailable: {e}")
+                self.db_path = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def key(self, backend, model_name, prompt, max_length, sampling):
+        """Cache key, or None when the generation is sampled and so not repeatable."""
+        if sampling.get("temperature") != 0:
+            with self._lock:
+                self.counters["uncacheable"] += 1
+            return None
+        payload = json.dumps([backend, model_name, prompt, max_length, sorted(sampling.items())],
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, text, expires_at):
+        self._memory[key] = (text, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                if item[1] >= now:
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return item[0]
+                del self._memory[key]
+                self.counters["expired"] += 1
+        row = None
+        if self.db_path:
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT text, created_at FROM generations WHERE key=? AND created_at>=?",
+                                   (key, now - self.ttl)).fetchone()
+                conn.close()
+            except sqlite3.Error:
+                row = None
+        with self._lock:
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._remember(key, row[0], row[1] + self.ttl)
+        return row[0]
+
+    def put(self, key, text):
+        if key is None or not text:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, text, now + self.ttl)
+            self.counters["stores"] += 1
+            self._puts_since_trim += 1
+            trim = self._puts_since_trim >= 200
+            if trim:
+                self._puts_since_trim = 0
+        if not self.db_path:
+            return
+        try:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO generations (key, text, created_at) VALUES (?, ?, ?)",
+                         (key, text, now))
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Could not store generation: {e}")
+            return
+        if trim:
+            self.trim()
+
+    def trim(self):
+        """Drop expired rows, then the oldest beyond ``max_rows``; returns rows removed."""
+        if not self.db_path:
+            return 0
+        try:
+            conn = self._connect()
+            removed = conn.execute("DELETE FROM generations WHERE created_at<?", (time.time() - self.ttl,)).rowcount
+            removed += conn.execute(
+                """DELETE FROM generations WHERE key IN (
+                   SELECT key FROM generations ORDER BY created_at DESC LIMIT -1 OFFSET ?)""",
+                (self.max_rows,)).rowcount
+            conn.commit()
+            conn.close()
+        except sqlite3.Error:
+            return 0
+        with self._lock:
+            self.counters["evictions"] += removed
+        return removed
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+            out["memory_items"] = len(self._memory)
+        lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = round((out["memory_hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        out["persistent"] = bool(self.db_path)
+        return out
@@ -1,54 +1,335 @@
+import gc
 import os
-try:
-    from gpt4all import GPT4All
-except Exception:
-    GPT4All = None
+import queue
+import threading
+import time
+
+from model.generation_cache import GenerationCache
+
+
+def stop_criteria(*events, require_all=False):
+    from transformers import StoppingCriteria, StoppingCriteriaList
+    events = [e for e in events if e is not None]
+    check = all if require_all else any
+
+    class StopOnEvent(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return check(e.is_set() for e in events)
+
+    return StoppingCriteriaList([StopOnEvent()])
+
+
+def find_model_file(model_dir):
+    if os.path.isdir(model_dir):
+        for f in os.listdir(model_dir):
+            if f.endswith(".bin") or f.endswith(".gguf"):
+                return os.path.join(model_dir, f)
+    return None
 
 
 class ModelPipeline:
-    def __init__(self, model_dir):
+    """Text generation with a local GPT4All model, else distilgpt2, else canned replies.
+
+    Nothing is imported or loaded until the first ``generate`` (or an
+    explicit ``warm_up``), so constructing a pipeline is free; ``backend``
+    stays None until then. Greedy (temperature 0) generations are cached.
+    Neither llama.cpp nor a transformers pipeline is re-entrant, so every
+    model call (direct, batched or streamed) holds ``_run_lock``.
+    """
+
+    def __init__(self, model_dir, cache=None, model_file=None):
+        self.model_dir = model_dir
+        # A specific .gguf/.bin file (see model/registry.py); default is the first one found
+        self.model_file = model_file
         self.model = None
         self.backend = None
+        self.model_name = None
+        # Pass cache=False (or set GEN_CACHE=0) to always run the model
+        if cache is None and os.getenv("GEN_CACHE", "1") != "0":
+            cache = GenerationCache()
+        self.cache = cache or None
+        self.load_seconds = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stream_counters = {"streams": 0, "ttft_seconds": 0.0}
 
+    def warm_up(self):
+        """Resolve and load the backend now; returns its name."""
+        if self.backend is None:
+            with self._lock:
+                if self.backend is None:
+                    t0 = time.perf_counter()
+                    self._load()
+                    self.load_seconds = round(time.perf_counter() - t0, 3)
+        return self.backend
+
+    def _load(self):
         # Load GPT4All model if available
-        model_file = None
-        if os.path.isdir(model_dir):
-            for f in os.listdir(model_dir):
-                if f.endswith(".bin") or f.endswith(".gguf"):
-                    model_file = os.path.join(model_dir, f)
-                    break
-
-        loaded = False
-        if GPT4All and model_file:
+        model_file = self.model_file or find_model_file(self.model_dir)
+        if model_file:
             try:
+                from gpt4all import GPT4All
                 model_name = os.path.basename(model_file)
                 model_path = os.path.dirname(model_file)
                 self.model = GPT4All(model_name, model_path=model_path)
                 self.backend = "gpt4all"
-                loaded = True
+                self.model_name = f"{model_name}:{os.path.getsize(model_file)}"
+                return
             except Exception:
                 pass
-        if not loaded:
+        try:
+            from transformers import pipeline, set_seed
+            set_seed(42)
+            self.model = pipeline("text-generation", model="distilgpt2")
+            # Batched prompts are left-padded with EOS (GPT-2 has no pad token)
+            self.model.tokenizer.padding_side = "left"
+            if self.model.tokenizer.pad_token_id is None:
+                self.model.tokenizer.pad_token_id = self.model.model.config.eos_token_id
+            self.backend = "transformers"
+            self.model_name = "distilgpt2"
+        except Exception:
+            self.model = None
+            self.backend = "basic"
+
+    def _sampling_key(self, prompt, max_length, temperature, top_k, top_p):
+        sampling = {k: v for k, v in (("temperature", temperature), ("top_k", top_k), ("top_p", top_p))
+                    if v is not None}
+        # The unit is part of the key so results from when transformers counted
+        # the prompt in max_length are never served from a persistent cache
+        length = ("new_tokens", max_length)
+        key = self.cache.key(self.backend, self.model_name, prompt, length, sampling) if self.cache else None
+        return sampling, key
+
+    def unload(self):
+        """Drop the loaded model; the next ``generate`` or ``warm_up`` loads it again."""
+        # Wait for a generation still running on this model
+        with self._lock, self._run_lock:
+            self.model = None
+            self.backend = None
+            self.model_name = None
+        gc.collect()
+
+    def memory_bytes(self):
+        """Approximate resident size of the loaded model (0 when nothing is loaded)."""
+        if self.backend == "gpt4all":
+            # GPT4All maps the weights file, so it costs about its size once touched
+            return os.path.getsize(self.model_file or find_model_file(self.model_dir))
+        if self.backend == "transformers":
+            return sum(p.numel() * p.element_size() for p in self.model.model.parameters())
+        return 0
+
+    def generate(self, prompt, max_length=120, stop_event=None, temperature=None, top_k=None, top_p=None):
+        """Complete ``prompt``; setting ``stop_event`` ends a running generation early.
+
+        ``max_length`` is the number of new tokens on every backend, not
+        counting the prompt. Sampling parameters left as None keep the
+        backend's defaults; ``temperature=0`` decodes greedily, which makes
+        the result cacheable.
+        """
+        self.warm_up()
+        if self.backend not in ("gpt4all", "transformers"):
+            return self._basic(prompt)
+        sampling, key = self._sampling_key(prompt, max_length, temperature, top_k, top_p)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        out = self._generate(prompt, max_length, stop_event, sampling)
+        # A stopped generation is truncated, so only complete ones are kept
+        if key is not None and not (stop_event is not None and stop_event.is_set()):
+            self.cache.put(key, out)
+        return out
+
+    def _generate(self, prompt, max_length, stop_event, sampling):
+        if self.backend == "gpt4all":
+            kwargs = {"temp" if k == "temperature" else k: v for k, v in sampling.items()}
+            if stop_event is not None:
+                kwargs["callback"] = lambda token_id, response: not stop_event.is_set()
+            with self._run_lock:
+                return self.model.generate(prompt, max_tokens=max_length, **kwargs)
+
+        kwargs = self._hf_sampling(sampling)
+        if stop_event is not None:
+            kwargs["stopping_criteria"] = stop_criteria(stop_event)
+        # transformers' max_length includes the prompt; GPT4All's max_tokens does not
+        with self._run_lock:
+            out = self.model(prompt, max_new_tokens=max_length, num_return_sequences=1, **kwargs)
+        return self._completion(prompt, out[0].get("generated_text", ""))
+
+    @staticmethod
+    def _hf_sampling(sampling):
+        if sampling.get("temperature") == 0:
+            return {"do_sample": False}
+        if sampling:
+            return dict(sampling, do_sample=True)
+        return {}
+
+    @staticmethod
+    def _completion(prompt, out):
+        if out.startswith(prompt):
+            out = out[len(prompt):]
+        return out.strip()
+
+    def generate_batch(self, prompts, max_length=120, stop_events=None, temperature=None, top_k=None, top_p=None):
+        """``generate`` for several prompts with the same parameters; returns texts in order.
+
+        The transformers backend runs the uncached prompts as one left-padded
+        batch; ``max_length`` counts new tokens, so padding never shortens a
+        prompt's completion and it matches ``generate``'s. Other backends
+        generate them one after another. The batch stops early only once
+        every one of ``stop_events`` is set.
+        """
+        self.warm_up()
+        if self.backend not in ("gpt4all", "transformers"):
+            return [self._basic(p) for p in prompts]
+        stop_events = list(stop_events or [None] * len(prompts))
+        results = [None] * len(prompts)
+        keys = [None] * len(prompts)
+        todo = []
+        for i, prompt in enumerate(prompts):
+            sampling, keys[i] = self._sampling_key(prompt, max_length, temperature, top_k, top_p)
+            hit = self.cache.get(keys[i]) if keys[i] is not None else None
+            if hit is not None:
+                results[i] = hit
+            else:
+                todo.append(i)
+        if not todo:
+            return results
+        if self.backend == "transformers" and len(todo) > 1:
+            kwargs = self._hf_sampling(sampling)
+            waiting = [stop_events[i] for i in todo]
+            if all(e is not None for e in waiting):
+                kwargs["stopping_criteria"] = stop_criteria(*waiting, require_all=True)
+            batch = [prompts[i] for i in todo]
+            with self._run_lock:
+                outs = self.model(batch, max_new_tokens=max_length, num_return_sequences=1, batch_size=len(batch),
+                                  **kwargs)
+            for i, out in zip(todo, outs):
+                results[i] = self._completion(prompts[i], out[0].get("generated_text", ""))
+        else:
+            for i in todo:
+                results[i] = self._generate(prompts[i], max_length, stop_events[i], sampling)
+        for i in todo:
+            stopped = stop_events[i] is not None and stop_events[i].is_set()
+            if keys[i] is not None and not stopped:
+                self.cache.put(keys[i], results[i])
+        return results
+
+    def generate_stream(self, prompt, max_length=120, stop_event=None, temperature=None, top_k=None, top_p=None):
+        """Yield the completion of ``prompt`` piece by piece as the backend produces it.
+
+        Closing the generator (e.g. the client went away) or setting
+        ``stop_event`` stops the model at its next token. A cached greedy
+        result is yielded in one piece.
+        """
+        t0 = time.perf_counter()
+        first = True
+        for piece in self._stream(prompt, max_length, stop_event, temperature, top_k, top_p):
+            if not piece:
+                continue
+            if first:
+                first = False
+                with self._stats_lock:
+                    self.stream_counters["streams"] += 1
+                    self.stream_counters["ttft_seconds"] += time.perf_counter() - t0
+            yield piece
+
+    def _stream(self, prompt, max_length, stop_event, temperature, top_k, top_p):
+        self.warm_up()
+        if self.backend not in ("gpt4all", "transformers"):
+            yield self._basic(prompt)
+            return
+        sampling, key = self._sampling_key(prompt, max_length, temperature, top_k, top_p)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                yield hit
+                return
+        halt = threading.Event()
+        pieces = []
+        stream = self._stream_gpt4all if self.backend == "gpt4all" else self._stream_transformers
+        tokens = stream(prompt, max_length, sampling, halt, stop_event)
+        try:
+            for piece in tokens:
+                if not pieces:
+                    # Same as generate(): no leading whitespace before the text
+                    piece = piece.lstrip()
+                    if not piece:
+                        continue
+                pieces.append(piece)
+                yield piece
+                if stop_event is not None and stop_event.is_set():
+                    return
+        finally:
+            # Stops the model and waits for it, so the caller's lease outlives the generation
+            tokens.close()
+        if key is not None and not (stop_event is not None and stop_event.is_set()):
+            self.cache.put(key, "".join(pieces).strip())
+
+    def _stream_gpt4all(self, prompt, max_length, sampling, halt, stop_event):
+        kwargs = {"temp" if k == "temperature" else k: v for k, v in sampling.items()}
+        pieces = queue.Queue()
+
+        def keep_going(token_id, response):
+            # GPT4All hands each new token's text to the callback
+            pieces.put(response)
+            return not (halt.is_set() or (stop_event is not None and stop_event.is_set()))
+
+        def run():
             try:
-                from transformers import pipeline, set_seed
-                set_seed(42)
-                self.model = pipeline("text-generation", model="distilgpt2")
-                self.backend = "transformers"
-                loaded = True
-            except Exception:
-                self.backend = "basic"
+                with self._run_lock:
+                    if not halt.is_set():
+                        self.model.generate(prompt, max_tokens=max_length, callback=keep_going, **kwargs)
+            except Exception as e:
+                print(f"Streaming generation failed: {e}")
+            finally:
+                pieces.put(None)
+
+        return self._run_stream(run, iter(pieces.get, None), halt)
 
-    def generate(self, prompt, max_length=120):
-        if self.backend == "gpt4all" and isinstance(self.model, GPT4All):
-            return self.model.generate(prompt, max_tokens=max_length)
+    def _stream_transformers(self, prompt, max_length, sampling, halt, stop_event):
+        from transformers import TextIteratorStreamer
+        streamer = TextIteratorStreamer(self.model.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        kwargs = self._hf_sampling(sampling)
+        kwargs.update(streamer=streamer, stopping_criteria=stop_criteria(halt, stop_event))
 
-        if self.backend == "transformers" and self.model:
-            out = self.model(prompt, max_length=max_length, num_return_sequences=1)[0].get("generated_text", "")
-            if out.startswith(prompt):
-                out = out[len(prompt):]
-            return out.strip()
+        def run():
+            try:
+                with self._run_lock:
+                    if halt.is_set():
+                        streamer.end()
+                    else:
+                        self.model(prompt, max_new_tokens=max_length, num_return_sequences=1, **kwargs)
+            except Exception as e:
+                print(f"Streaming generation failed: {e}")
+                streamer.end()
+
+        return self._run_stream(run, streamer, halt)
 
+    @staticmethod
+    def _run_stream(target, pieces, halt):
+        # The model decodes on a helper thread; closing this generator halts it
+        # at its next token and joins it before returning
+        worker = threading.Thread(target=target, name="generate-stream", daemon=True)
+        worker.start()
+        try:
+            yield from pieces
+        finally:
+            halt.set()
+            worker.join()
+
+    @staticmethod
+    def _basic(prompt):
         lower = (prompt or "").lower()
         if "follow-up" in lower or "ask" in lower:
             return "Can you elaborate on your approach and trade-offs?"
         return "Please provide more details."
+
+    def status(self):
+        with self._stats_lock:
+            streams = self.stream_counters["streams"]
+            ttft = self.stream_counters["ttft_seconds"]
+        return {"backend": self.backend or "unloaded", "model": self.model_name, "load_seconds": self.load_seconds,
+                "cache": self.cache.stats() if self.cache else None, "streams": streams,
+                "ttft_ms_avg": round(ttft / streams * 1000, 2) if streams else None}
@@ -0,0 +1,203 @@
+import fnmatch
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from model.batching import BatchScheduler
+from model.generation_cache import GenerationCache
+from model.pipeline import ModelPipeline
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TRACKS_PATH = os.path.join(BASE_DIR, "data", "model_tracks.json")
+
+
+def list_model_files(model_dir):
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(f for f in os.listdir(model_dir) if f.endswith(".bin") or f.endswith(".gguf"))
+
+
+class _Entry:
+    __slots__ = ("name", "pipeline", "bytes", "in_use", "last_used", "scheduler")
+
+    def __init__(self, name, pipeline):
+        self.name = name
+        self.pipeline = pipeline
+        self.bytes = 0
+        self.in_use = 0
+        self.last_used = 0.0
+        self.scheduler = None
+
+
+class ModelRegistry:
+    """Per-track local models, loaded on demand within a memory budget.
+
+    ``data/model_tracks.json`` maps question-bank tracks to a named model and
+    each name to filename patterns in the model dir; tracks without a
+    matching file use the default model (the first file no pattern claims,
+    else the first file, else distilgpt2 as before). Models load on first
+    use. When loading one would push resident models past ``budget_bytes``
+    the least recently used idle ones are unloaded first; a model in use
+    through ``lease`` is never evicted.
+    """
+
+    # generate() batches concurrent calls per model (see model/batching.py)
+    batching = True
+
+    def __init__(self, model_dir, budget_bytes=None, tracks_path=None, track_alias=None, cache=None):
+        self.model_dir = model_dir
+        self.budget_bytes = int(budget_bytes or os.getenv("MODEL_MEMORY_BUDGET", 4 * 1024 ** 3))
+        self.track_alias = track_alias
+        # One generation cache for every model; keys already include the model
+        if cache is None and os.getenv("GEN_CACHE", "1") != "0":
+            cache = GenerationCache()
+        self.cache = cache or None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.events = deque(maxlen=50)
+        self.counters = {"leases": 0, "loads": 0, "evictions": 0, "over_budget": 0}
+
+        config = {}
+        path = tracks_path or DEFAULT_TRACKS_PATH
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                config = json.load(fh)
+        files = list_model_files(model_dir)
+        claimed = {}
+        for name, patterns in config.get("models", {}).items():
+            match = next((f for f in files if any(fnmatch.fnmatch(f.lower(), p.lower()) for p in patterns)), None)
+            if match:
+                claimed[name] = match
+        default_file = next((f for f in files if f not in claimed.values()), files[0] if files else None)
+
+        self._entries = {}
+        self._default = self._entry(default_file)
+        self.default = self._default.pipeline
+        self._tracks = {}
+        for track, name in config.get("tracks", {}).items():
+            if name in claimed:
+                self._tracks[track.lower()] = self._entry(claimed[name])
+
+    def _entry(self, filename):
+        name = filename or "default"
+        if name not in self._entries:
+            model_file = os.path.join(self.model_dir, filename) if filename else None
+            pipeline = ModelPipeline(self.model_dir, cache=self.cache if self.cache else False, model_file=model_file)
+            self._entries[name] = _Entry(name, pipeline)
+        return self._entries[name]
+
+    def _entry_for(self, track):
+        if track and self.track_alias:
+            track = self.track_alias(track)
+        return self._tracks.get((track or "").lower()) or self._default
+
+    def pipeline_for(self, track=None):
+        return self._entry_for(track).pipeline
+
+    def lease(self, track=None):
+        """The track's pipeline, loaded and protected from eviction while the block runs."""
+        return self._lease(self._entry_for(track))
+
+    @contextmanager
+    def _lease(self, entry):
+        with self._lock:
+            entry.in_use += 1
+            entry.last_used = time.monotonic()
+            self.counters["leases"] += 1
+        try:
+            if entry.pipeline.backend is None:
+                self._load(entry)
+            yield entry.pipeline
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def generate(self, prompt, track=None, **kwargs):
+        """``generate`` on the track's model, batched with concurrent calls for the same model."""
+        entry = self._entry_for(track)
+        with self._lease(entry) as pipeline:
+            with self._lock:
+                if entry.scheduler is None:
+                    entry.scheduler = BatchScheduler(pipeline)
+                scheduler = entry.scheduler
+            return scheduler.generate(prompt, **kwargs)
+
+    def warm_up(self, track=None):
+        with self.lease(track) as pipeline:
+            return pipeline.backend
+
+    def _estimate(self, entry):
+        model_file = entry.pipeline.model_file
+        return os.path.getsize(model_file) if model_file and os.path.exists(model_file) else entry.bytes
+
+    def _load(self, entry):
+        # One load at a time so two models never come in over budget together
+        with self._load_lock:
+            if entry.pipeline.backend is not None:
+                return
+            self._make_room(self._estimate(entry), keep=entry, warn=False)
+            t0 = time.perf_counter()
+            backend = entry.pipeline.warm_up()
+            seconds = time.perf_counter() - t0
+            with self._lock:
+                entry.bytes = entry.pipeline.memory_bytes()
+                self.counters["loads"] += 1
+            self._event("load", entry, backend=backend, seconds=round(seconds, 3))
+            # The real size may differ from the file-size estimate
+            self._make_room(0, keep=entry)
+
+    def _make_room(self, extra, keep, warn=True):
+        evicted = []
+        with self._lock:
+            loaded = [e for e in self._entries.values() if e.pipeline.backend is not None]
+            total = sum(e.bytes for e in loaded) + extra
+            idle = sorted((e for e in loaded if e is not keep and e.in_use == 0), key=lambda e: e.last_used)
+            while total > self.budget_bytes and idle:
+                victim = idle.pop(0)
+                total -= victim.bytes
+                evicted.append((victim, victim.bytes))
+                # Mark it gone before releasing the lock so no lease sees it half-unloaded
+                victim.pipeline.backend = None
+            over = warn and total > self.budget_bytes
+            if over:
+                self.counters["over_budget"] += 1
+        for victim, size in evicted:
+            victim.pipeline.unload()
+            with self._lock:
+                victim.bytes = 0
+                self.counters["evictions"] += 1
+            self._event("evict", victim, bytes_freed=size)
+        if over:
+            print(f"Model registry: {total} bytes needed for {keep.name} exceeds the budget of "
+                  f"{self.budget_bytes} bytes with every other model in use or unloaded")
+
+    def _event(self, kind, entry, **details):
+        event = dict(details, event=kind, model=entry.name, at=time.time(), resident_bytes=self.resident_bytes())
+        self.events.append(event)
+        print(f"Model registry: {kind} {entry.name} " + " ".join(f"{k}={v}" for k, v in details.items()))
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(e.bytes for e in self._entries.values() if e.pipeline.backend is not None)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+            models = [{"name": e.name, "resident": e.pipeline.backend is not None, "bytes": e.bytes,
+                       "in_use": e.in_use, "tracks": sorted(t for t, te in self._tracks.items() if te is e),
+                       "batching": e.scheduler.stats() if e.scheduler else None}
+                      for e in self._entries.values()]
+            out["events"] = list(self.events)[-20:]
+        for m, e in zip(models, self._entries.values()):
+            status = e.pipeline.status()
+            status.pop("cache", None)
+            m.update(status)
+        out["models"] = models
+        out["resident_bytes"] = self.resident_bytes()
+        out["budget_bytes"] = self.budget_bytes
+        out["cache"] = self.cache.stats() if self.cache else None
+        return out
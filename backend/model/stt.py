@@ -1,15 +1,41 @@
 import os
+import time
+
 import numpy as np
 
+from model.audio_decode import load_audio, load_audio_bytes
+from model.chunking import fixed_windows, plan_windows, window_audio
+from model.stt_cache import TranscriptionCache
+from model.vad import detect_speech, gather_speech
+
 class WhisperSTT:
-    def __init__(self, model_name=None, hf_token=None, device=None):
+    def __init__(self, model_name=None, hf_token=None, device=None, batch_size=None, cache=None,
+                 cpu_mode=None, num_threads=None, chunking=None):
         self.model = None
         self.processor = None
         self.forced_decoder_ids = None
         self.device = device or ("cuda" if self._cuda_available() else "cpu")
         self.model_name = model_name or "openai/whisper-base.en"
+        # Max number of 30 s chunks decoded by a single generate() call
+        self.batch_size = max(1, int(batch_size or os.getenv("STT_BATCH_SIZE", 8)))
+        # "fp32" (default) or "int8": dynamic int8 quantization of Linear layers on CPU
+        self.cpu_mode = (cpu_mode or os.getenv("STT_CPU_MODE") or "fp32").lower()
+        self.num_threads = int(num_threads or os.getenv("STT_THREADS") or 0)
+        # "silence" packs VAD segments into windows cut at quiet frames; "fixed" slices every 30 s
+        self.chunking = (chunking or os.getenv("STT_CHUNKING") or "silence").lower()
+        # Pass cache=False (or set STT_CACHE=0) to always re-run Whisper
+        if cache is None and os.getenv("STT_CACHE", "1") != "0":
+            cache = TranscriptionCache()
+        self.cache = cache or None
         self._init_model(hf_token)
 
+    @property
+    def cache_tag(self):
+        # Quantized output can differ from fp32, so keep their cache entries apart
+        if self.device == "cpu" and self.cpu_mode == "int8":
+            return f"{self.model_name}:int8"
+        return self.model_name
+
     def _cuda_available(self):
         try:
             import torch
@@ -18,169 +44,126 @@ class WhisperSTT:
             return False
 
     def _init_model(self, hf_token):
+        self.load_error = None
         try:
             from transformers import WhisperProcessor, WhisperForConditionalGeneration
             import torch
             auth = hf_token or os.getenv("HF_TOKEN") or os.getenv("HUGGINGFACE_TOKEN")
             self.model = WhisperForConditionalGeneration.from_pretrained(self.model_name, use_auth_token=auth)
             self.model = self.model.to(self.device)
+            if self.device == "cpu":
+                if self.num_threads > 0:
+                    torch.set_num_threads(self.num_threads)
+                if self.cpu_mode == "int8":
+                    self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model.eval()
             self.processor = WhisperProcessor.from_pretrained(self.model_name, use_auth_token=auth)
             self.forced_decoder_ids = self.processor.get_decoder_prompt_ids(language="en", task="transcribe")
-        except Exception:
+        except Exception as e:
             self.model = None
             self.processor = None
             self.forced_decoder_ids = None
+            self.load_error = f"{type(e).__name__}: {e}"
 
-    def _load_audio(self, path, target_sr=16000):
-        arr = None
-        sr = None
-        try:
-            import torchaudio
-            waveform, sample_rate = torchaudio.load(path)
-            if waveform.shape[0] > 1:
-                waveform = waveform.mean(dim=0, keepdim=True)
-            if sample_rate != target_sr:
-                resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=target_sr)
-                waveform = resampler(waveform)
-            arr = waveform.squeeze(0).numpy()
-            sr = target_sr
-            return arr, sr
-        except Exception:
-            pass
+    def _load_audio(self, path, target_sr=16000, timings=None):
+        return load_audio(path, target_sr=target_sr, timings=timings)
 
-        try:
-            import av, resampy
-            container = av.open(path)
-            stream = next((s for s in container.streams if s.type == 'audio'), None)
-            if stream is None:
-                raise RuntimeError('no audio stream')
-            frames = []
-            for frame in container.decode(stream):
-                samples = frame.to_ndarray()
-                if samples.ndim == 2:
-                    samples = samples.mean(axis=0)
-                if samples.dtype.kind in 'iu':
-                    samples = samples.astype(np.float32) / np.iinfo(samples.dtype).max
-                else:
-                    samples = samples.astype(np.float32)
-                frames.append(samples)
-            container.close()
-            if frames:
-                data = np.concatenate(frames)
-                if stream.rate and stream.rate != target_sr:
-                    data = resampy.resample(data, stream.rate, target_sr)
-                arr = data
-                sr = target_sr
-                return arr, sr
-        except Exception:
-            pass
-
-        try:
-            import soundfile as sf, resampy
-            data, sample_rate = sf.read(path, always_2d=False)
-            if isinstance(data, np.ndarray) and data.ndim == 2:
-                data = data.mean(axis=1)
-            if sample_rate != target_sr:
-                try:
-                    data = resampy.resample(data, sample_rate, target_sr)
-                except Exception:
-                    pass
-            arr = np.asarray(data, dtype=np.float32)
-            sr = target_sr
-            return arr, sr
-        except Exception:
-            pass
-
-        try:
-            from moviepy.editor import AudioFileClip
-            import tempfile
-            clip = AudioFileClip(path)
-            tmpwav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            clip.write_audiofile(tmpwav.name, fps=target_sr, nbytes=2, verbose=False, logger=None)
-            clip.close()
-            import soundfile as sf
-            data, sample_rate = sf.read(tmpwav.name, always_2d=False)
-            if isinstance(data, np.ndarray) and data.ndim == 2:
-                data = data.mean(axis=1)
-            arr = np.asarray(data, dtype=np.float32)
-            sr = sample_rate
-            try:
-                os.remove(tmpwav.name)
-            except Exception:
-                pass
-            return arr, sr
-        except Exception:
-            pass
+    # Every transcribe_* method accepts an optional ``timings`` dict that is
+    # filled with per-stage seconds (decode, resample, vad, chunking,
+    # features, generate) for benchmarking and request tracing.
 
-        try:
-            import subprocess, tempfile
-            d = tempfile.mkdtemp()
-            tmp = os.path.join(d, "audio.wav")
-            subprocess.run(["ffmpeg", "-y", "-i", path, "-ar", str(target_sr), "-ac", "1", tmp],
-                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
-            import soundfile as sf
-            data, sample_rate = sf.read(tmp, always_2d=False)
-            if isinstance(data, np.ndarray) and data.ndim == 2:
-                data = data.mean(axis=1)
-            arr = np.asarray(data, dtype=np.float32)
-            sr = sample_rate
+    def transcribe_file(self, path, timings=None):
+        if not self.model or not self.processor:
+            return None
+        raw_key = None
+        if self.cache:
             try:
-                if os.path.exists(tmp):
-                    os.remove(tmp)
-            except Exception:
-                pass
-            return arr, sr
-        except Exception:
-            pass
+                with open(path, "rb") as fh:
+                    raw_key = self.cache.key_for_bytes(fh.read(), self.cache_tag)
+            except OSError:
+                raw_key = None
+            hit = self.cache.get(raw_key) if raw_key else None
+            if hit is not None:
+                return hit
+        audio, sr = self._load_audio(path, target_sr=16000, timings=timings)
+        return self._transcribe_audio(audio, sr, raw_key=raw_key, timings=timings)
 
-        return None, None
+    def transcribe_bytes(self, data, ext=None, timings=None):
+        """Transcribe an in-memory upload (bytes, bytearray or memoryview)."""
+        if not self.model or not self.processor:
+            return None
+        raw_key = None
+        if self.cache and data:
+            raw_key = self.cache.key_for_bytes(data, self.cache_tag)
+            hit = self.cache.get(raw_key)
+            if hit is not None:
+                return hit
+        audio, sr = load_audio_bytes(data, ext=ext, target_sr=16000, timings=timings)
+        return self._transcribe_audio(audio, sr, raw_key=raw_key, timings=timings)
 
-    def transcribe_file(self, path):
+    def transcribe_stream(self, stream, ext=None, timings=None):
+        """Transcribe from a readable stream such as a werkzeug ``FileStorage.stream``."""
         if not self.model or not self.processor:
             return None
-        audio, sr = self._load_audio(path, target_sr=16000)
+        try:
+            data = stream.read()
+        except Exception:
+            return None
+        return self.transcribe_bytes(data, ext=ext, timings=timings)
+
+    def _transcribe_audio(self, audio, sr, raw_key=None, timings=None):
         if audio is None:
             return None
+        # Same recording in a different container still hits on the decoded PCM
+        pcm_key = None
+        if self.cache:
+            pcm_key = self.cache.key_for_audio(audio, sr, self.cache_tag)
+            hit = self.cache.get(pcm_key)
+            if hit is not None:
+                if raw_key:
+                    self.cache.put(raw_key, hit)
+                return hit
+        text = self._run_whisper(audio, sr, timings=timings if timings is not None else {})
+        if text and self.cache:
+            self.cache.put(pcm_key, text)
+            if raw_key:
+                self.cache.put(raw_key, text)
+        return text
+
+    def _features(self, batch):
+        return self.processor(batch, sampling_rate=16000, return_tensors="pt").input_features.to(self.device)
+
+    def _generate(self, feats):
+        import torch
+        with torch.no_grad():
+            ids = self.model.generate(feats, forced_decoder_ids=self.forced_decoder_ids)
+        return self.processor.batch_decode(ids, skip_special_tokens=True)
+
+    def _run_whisper(self, audio, sr, timings):
         try:
-            import torch
+            t0 = time.perf_counter()
             audio = np.asarray(audio, dtype=np.float32)
             audio = audio / (np.max(np.abs(audio)) + 1e-8)
-            frame = int(0.02 * sr)
-            if frame <= 0:
-                frame = 320
-            rms = []
-            for i in range(0, len(audio), frame):
-                seg = audio[i:i+frame]
-                if len(seg) == 0:
-                    rms.append(0.0)
-                else:
-                    rms.append(float(np.sqrt(np.mean(seg*seg))))
-            thr = float(np.percentile(rms, 20))
-            mask = []
-            for i in range(len(rms)):
-                mask.append(1 if rms[i] >= max(0.01, thr) else 0)
-            cleaned = []
-            for i in range(len(mask)):
-                if mask[i] == 1:
-                    s = i*frame
-                    e = min((i+1)*frame, len(audio))
-                    cleaned.append(audio[s:e])
-            if cleaned:
-                audio = np.concatenate(cleaned)
-            chunk_len = int(30 * sr)
+            vad = detect_speech(audio, sr)
+            t1 = time.perf_counter()
+            if self.chunking == "fixed":
+                chunks = fixed_windows(gather_speech(audio, vad), sr)
+            else:
+                chunks = [window_audio(audio, w) for w in plan_windows(vad, sr)]
+            t2 = time.perf_counter()
+            timings["vad"] = t1 - t0
+            timings["chunking"] = t2 - t1
+            timings["features"] = timings["generate"] = 0.0
+            timings["windows"] = len(chunks)
             texts = []
-            for j in range(0, len(audio), chunk_len):
-                chunk = audio[j:j+chunk_len]
-                if len(chunk) == 0:
-                    continue
-                feats = self.processor(chunk, sampling_rate=16000, return_tensors="pt").input_features
-                feats = feats.to(self.device)
-                with torch.no_grad():
-                    ids = self.model.generate(feats, forced_decoder_ids=self.forced_decoder_ids)
-                out = self.processor.batch_decode(ids, skip_special_tokens=True)
-                txt = (out[0] or "").strip() if out else ""
-                if txt:
-                    texts.append(txt)
+            for b in range(0, len(chunks), self.batch_size):
+                t3 = time.perf_counter()
+                feats = self._features(chunks[b:b+self.batch_size])
+                t4 = time.perf_counter()
+                out = self._generate(feats)
+                timings["features"] += t4 - t3
+                timings["generate"] += time.perf_counter() - t4
+                texts.extend(t.strip() for t in out if t and t.strip())
             res = " ".join(texts).strip()
             return res if res else None
         except Exception:
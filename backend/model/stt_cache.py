@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "stt_cache")
+
+
+class TranscriptionCache:
+    """Two-tier transcript cache: an in-process LRU in front of a shared directory.
+
+    Keys are content hashes (raw upload bytes or decoded PCM) salted with the
+    model name, so a retried upload or a replayed recording skips decoding
+    and Whisper entirely. The disk tier is evicted oldest-first once it grows
+    past ``max_disk_bytes``.
+    """
+
+    def __init__(self, cache_dir=None, max_items=None, max_disk_bytes=None):
+        self.cache_dir = cache_dir or os.getenv("STT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_items = int(max_items or os.getenv("STT_CACHE_MEMORY_ITEMS", 256))
+        self.max_disk_bytes = int(max_disk_bytes or os.getenv("STT_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._disk_bytes = sum(e.stat().st_size for e in os.scandir(self.cache_dir) if e.is_file())
+        except OSError:
+            self.cache_dir = None
+
+    @staticmethod
+    def key_for_bytes(data, model_name):
+        h = hashlib.sha256(model_name.encode("utf-8"))
+        h.update(b"\0raw\0")
+        h.update(data)
+        return h.hexdigest()
+
+    @staticmethod
+    def key_for_audio(audio, sr, model_name):
+        h = hashlib.sha256(model_name.encode("utf-8"))
+        h.update(f"\0pcm{sr}\0".encode("ascii"))
+        h.update(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".txt")
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return self._memory[key]
+        text = None
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as fh:
+                    text = fh.read()
+                os.utime(self._path(key))
+            except OSError:
+                text = None
+        with self._lock:
+            if text is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        if not text:
+            return
+        with self._lock:
+            self._remember(key, text)
+            self.counters["stores"] += 1
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes += len(text.encode("utf-8"))
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        # Other processes share the directory, so rescan rather than trust our tally
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_file() and e.name.endswith(".txt")]
+            entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+            self.counters["evictions"] += evicted
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+            out["memory_items"] = len(self._memory)
+            out["disk_bytes"] = self._disk_bytes
+        lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = round((out["memory_hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return out
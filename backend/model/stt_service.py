@@ -0,0 +1,301 @@
+"""Shared speech-to-text service.
+
+A fixed pool of worker processes, each holding one ``WhisperSTT``, consumes
+jobs from a bounded local queue. Web workers talk to it over a Unix socket
+through ``STTClient``, which exposes the same ``transcribe_*`` methods as
+``WhisperSTT``, so RAM scales with ``STT_WORKERS`` instead of gunicorn workers.
+
+Run from the backend directory:
+
+    python -m model.stt_service
+
+and start the web app with ``STT_MODE=service``.
+
+Configuration (environment):
+    STT_SOCKET       Unix socket path (default /tmp/ai-interviewer-stt.sock)
+    STT_WORKERS      number of model-holding processes (default 1)
+    STT_QUEUE_DEPTH  max queued jobs before new ones are rejected (default 16)
+    STT_JOB_TIMEOUT  seconds one job may take (default 120); a worker still on it
+                     afterwards is restarted, and a job still queued is skipped
+    STT_RESTART_MAX_BACKOFF  longest wait in seconds before restarting a worker
+                     that keeps crashing soon after it starts (default 60)
+"""
+import itertools
+import json
+import multiprocessing as mp
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+DEFAULT_SOCKET = "/tmp/ai-interviewer-stt.sock"
+
+_HEADER = struct.Struct("!I")
+
+# A worker that exits sooner than this after starting counts as crashing on startup
+_RESTART_GRACE = 30.0
+
+
+def _config(name, default, cast=int):
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return cast(default)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _send_msg(sock, header, payload=b""):
+    raw = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(raw)) + raw)
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv_msg(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    header = json.loads(_recv_exact(sock, size).decode("utf-8"))
+    payload = _recv_exact(sock, int(header.get("size") or 0)) if header.get("size") else b""
+    return header, payload
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _worker_main(jobs, results, model_name, holding):
+    from model.stt import WhisperSTT
+    stt = WhisperSTT(model_name=model_name)
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, data, ext, deadline = job
+        # ``holding`` tells the server which job this process is on, so it can
+        # stop the process if the job outlives its timeout
+        with holding.get_lock():
+            holding.value = job_id
+        if time.time() > deadline:
+            # The caller already gave up while this sat in the queue
+            text, error = None, "timeout"
+        else:
+            try:
+                text, error = stt.transcribe_bytes(data, ext=ext), None
+            except Exception as e:
+                text, error = None, str(e)
+        with holding.get_lock():
+            holding.value = 0
+        results.put((job_id, text, error))
+
+
+class STTServer:
+    def __init__(self, socket_path=None, workers=None, queue_depth=None, job_timeout=None, model_name=None):
+        self.socket_path = socket_path or os.getenv("STT_SOCKET", DEFAULT_SOCKET)
+        self.num_workers = max(1, workers or _config("STT_WORKERS", 1))
+        self.queue_depth = max(1, queue_depth or _config("STT_QUEUE_DEPTH", 16))
+        self.job_timeout = job_timeout or _config("STT_JOB_TIMEOUT", 120, float)
+        self.max_backoff = _config("STT_RESTART_MAX_BACKOFF", 60, float)
+        self.model_name = model_name
+        ctx = mp.get_context("spawn")
+        self._ctx = ctx
+        self.jobs = ctx.Queue(maxsize=self.queue_depth)
+        self.results = ctx.Queue()
+        self.workers = []
+        # Per worker slot: the job id it is running (0 when idle), when it
+        # started, consecutive startup crashes and when it may be restarted
+        self._holding = []
+        self._started = []
+        self._failures = []
+        self._retry_at = []
+        self._killed = set()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._stopping = threading.Event()
+        self._server = None
+
+    def _spawn(self, i):
+        # A fresh Value per process: one killed mid-update may leave its lock held
+        holding = self._ctx.Value("q", 0)
+        p = self._ctx.Process(target=_worker_main, args=(self.jobs, self.results, self.model_name, holding),
+                              daemon=True)
+        p.start()
+        with self._lock:
+            self.workers[i] = p
+            self._holding[i] = holding
+            self._started[i] = time.monotonic()
+            self._retry_at[i] = None
+
+    def _collect_results(self):
+        while not self._stopping.is_set():
+            try:
+                job_id, text, error = self.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                slot = self._pending.get(job_id)
+            if slot is not None:
+                slot["text"], slot["error"] = text, error
+                slot["done"].set()
+
+    def _supervise(self):
+        # Replace workers that died (crash, OOM kill, stopped for a timeout) so
+        # the pool keeps its size; one that keeps dying right after starting is
+        # restarted after 2, 4, 8... seconds up to ``max_backoff``
+        while not self._stopping.wait(1.0):
+            now = time.monotonic()
+            for i, p in enumerate(list(self.workers)):
+                if p.is_alive():
+                    continue
+                with self._lock:
+                    killed = i in self._killed
+                    self._killed.discard(i)
+                if self._retry_at[i] is None:
+                    crashed = not killed and now - self._started[i] < _RESTART_GRACE
+                    self._failures[i] = self._failures[i] + 1 if crashed else 0
+                    delay = min(self.max_backoff, 2 ** self._failures[i]) if self._failures[i] else 0
+                    self._retry_at[i] = now + delay
+                    print(f"STT worker {p.pid} exited ({p.exitcode}); restarting"
+                          + (f" in {delay:.0f}s" if delay else ""))
+                if now >= self._retry_at[i]:
+                    self._spawn(i)
+
+    def _abandon(self, job_id):
+        # Stop the worker still running a timed-out job; _supervise replaces it
+        with self._lock:
+            for i, holding in enumerate(self._holding):
+                with holding.get_lock():
+                    if holding.value != job_id:
+                        continue
+                    p = self.workers[i]
+                    self._killed.add(i)
+                    p.terminate()
+                print(f"STT worker {p.pid} exceeded {self.job_timeout}s on job {job_id}; restarting it")
+                return
+
+    def submit(self, data, ext=None):
+        """Queue one job and block until it finishes; returns ``(text, error)``."""
+        job_id = next(self._ids)
+        slot = {"done": threading.Event(), "text": None, "error": None}
+        with self._lock:
+            self._pending[job_id] = slot
+        try:
+            try:
+                self.jobs.put_nowait((job_id, data, ext, time.time() + self.job_timeout))
+            except queue.Full:
+                return None, "busy"
+            if not slot["done"].wait(self.job_timeout):
+                self._abandon(job_id)
+                return None, "timeout"
+            return slot["text"], slot["error"]
+        finally:
+            with self._lock:
+                self._pending.pop(job_id, None)
+
+    def serve_forever(self):
+        n = self.num_workers
+        self.workers, self._holding, self._started = [None] * n, [None] * n, [0.0] * n
+        self._failures, self._retry_at = [0] * n, [None] * n
+        for i in range(n):
+            self._spawn(i)
+        threading.Thread(target=self._collect_results, daemon=True).start()
+        threading.Thread(target=self._supervise, daemon=True).start()
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        service = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                try:
+                    header, payload = _recv_msg(self.request)
+                    text, error = service.submit(payload, ext=header.get("ext"))
+                    _send_msg(self.request, {"text": text, "error": error})
+                except Exception as e:
+                    try:
+                        _send_msg(self.request, {"text": None, "error": str(e)})
+                    except Exception:
+                        pass
+
+        self._server = _UnixServer(self.socket_path, Handler)
+        print(f"STT service on {self.socket_path}: {self.num_workers} workers, "
+              f"queue depth {self.queue_depth}, job timeout {self.job_timeout}s")
+        try:
+            self._server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self._stopping.set()
+        if self._server:
+            self._server.server_close()
+        for _ in self.workers:
+            try:
+                self.jobs.put_nowait(None)
+            except queue.Full:
+                break
+        for p in self.workers:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+
+class STTClient:
+    """Drop-in replacement for ``WhisperSTT`` that forwards work to ``STTServer``."""
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or os.getenv("STT_SOCKET", DEFAULT_SOCKET)
+        # Allow a little slack over the server-side job timeout for transfer time
+        self.timeout = timeout or _config("STT_JOB_TIMEOUT", 120, float) + 5
+
+    def transcribe_bytes(self, data, ext=None):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        if not data:
+            return None
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                _send_msg(sock, {"ext": ext, "size": len(data)}, bytes(data))
+                header, _ = _recv_msg(sock)
+        except Exception as e:
+            print(f"STT service error: {e}")
+            return None
+        if header.get("error"):
+            print(f"STT service error: {header['error']}")
+        return header.get("text")
+
+    def transcribe_stream(self, stream, ext=None):
+        try:
+            data = stream.read()
+        except Exception:
+            return None
+        return self.transcribe_bytes(data, ext=ext)
+
+    def transcribe_file(self, path):
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return None
+        return self.transcribe_bytes(data, ext=os.path.splitext(path)[1])
+
+
+if __name__ == "__main__":
+    STTServer().serve_forever()
@@ -0,0 +1,376 @@
+import hashlib
+import os
+import re
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from model.tts_worker import TTSWorker, select_voice
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MEDIA_ROOT = os.path.abspath(os.path.join(BASE_DIR, "..", "frontend", "media"))
+CACHE_SUBDIR = os.path.join("tts", "_cache")
+
+# TTS_FORMAT -> (file extension, mimetype, ffmpeg encoder arguments); speech at
+# 24 kb/s Opus is roughly a tenth of the 16-bit PCM pyttsx3 writes
+FORMATS = {
+    "wav": (".wav", "audio/wav", None),
+    "ogg": (".ogg", "audio/ogg", ["-c:a", "libopus", "-b:a", "24k", "-application", "voip"]),
+    "mp3": (".mp3", "audio/mpeg", ["-c:a", "libmp3lame", "-q:a", "7"]),
+}
+
+
+def render_pyttsx3(text, path, voice="female", rate=130):
+    """Render in-process with a fresh engine (TTS_ENGINE=inline)."""
+    import pyttsx3
+    engine = pyttsx3.init()
+    select_voice(engine, voice)
+
+    # Set reasonable speech rate
+    engine.setProperty('rate', rate)
+
+    engine.save_to_file(text, path)
+    engine.runAndWait()
+
+
+def encode_audio(src, dst, fmt):
+    """Transcode the WAV at ``src`` into ``dst`` with ffmpeg."""
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", src, "-ac", "1", *FORMATS[fmt][2], dst]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=60)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg encode failed: {proc.stderr.decode(errors='ignore').strip()[:200]}")
+
+
+def split_sentences(text):
+    return [p for p in re.split(r"(?<=[.!?])\s+", (text or "").strip()) if p]
+
+
+def wav_stream_header(channels, sampwidth, framerate):
+    # Lengths are unknown while streaming; 0xFFFFFFFF makes players read until EOF
+    return struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 0xFFFFFFFF, b"WAVE", b"fmt ", 16, 1,
+                       channels, framerate, framerate * channels * sampwidth, channels * sampwidth,
+                       sampwidth * 8, b"data", 0xFFFFFFFF)
+
+
+def default_renderer(voice, rate):
+    # "process" (default) keeps one engine alive in a worker process;
+    # "inline" re-initializes pyttsx3 in the calling thread for every render
+    if os.getenv("TTS_ENGINE", "process").lower() == "inline":
+        return render_pyttsx3
+    return TTSWorker(voice=voice, rate=rate).render
+
+
+class TTSCache:
+    """Content-addressed store of rendered speech shared by all sessions.
+
+    Files are named by sha256(text, voice, rate) under ``media/tts/_cache``,
+    so a question is synthesized once and every later request is a file
+    existence check. The directory is trimmed oldest-first (by mtime, which
+    hits refresh) when it grows past ``max_bytes``.
+    """
+
+    def __init__(self, media_root=None, voice=None, rate=None, max_bytes=None, renderer=None, fmt=None):
+        self.media_root = media_root or DEFAULT_MEDIA_ROOT
+        self.cache_dir = os.path.join(self.media_root, CACHE_SUBDIR)
+        self.voice = voice or os.getenv("TTS_VOICE", "female")
+        self.rate = int(rate or os.getenv("TTS_RATE", 130))
+        self.max_bytes = int(max_bytes or os.getenv("TTS_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+        self.format = (fmt or os.getenv("TTS_FORMAT") or "wav").lower()
+        if self.format not in FORMATS:
+            print(f"Unknown TTS_FORMAT {self.format!r}; using wav")
+            self.format = "wav"
+        elif self.format != "wav" and not shutil.which("ffmpeg"):
+            print(f"ffmpeg not found; TTS_FORMAT={self.format} falls back to wav")
+            self.format = "wav"
+        self.ext, self.mimetype = FORMATS[self.format][:2]
+        self.renderer = renderer or default_renderer(self.voice, self.rate)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._executor = None
+        # Queued jobs whose marker is older than this are reported as failed
+        self.job_timeout = float(os.getenv("TTS_JOB_TIMEOUT", 120))
+        self.counters = {"hits": 0, "misses": 0, "renders": 0, "failures": 0, "evictions": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, text):
+        raw = f"{self.voice}\0{self.rate}\0{text}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()[:32]
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + self.ext)
+
+    def url_for(self, key):
+        return "/media/" + CACHE_SUBDIR.replace(os.sep, "/") + "/" + key + self.ext
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def lookup(self, text):
+        """URL of the cached rendering of ``text``, or None without rendering."""
+        path = self.path_for(self.key(text))
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self._count("hits")
+            return self.url_for(self.key(text))
+        return None
+
+    def render(self, text):
+        """Return the URL for ``text``, synthesizing it first on a miss."""
+        if not text:
+            return None
+        url = self.lookup(text)
+        if url:
+            return url
+        self._count("misses")
+        key = self.key(text)
+        # Collapse concurrent misses for the same text onto one render
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if not owner:
+            event.wait()
+            return self.url_for(key) if os.path.exists(self.path_for(key)) else None
+        try:
+            return self._render_to_cache(text, key)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _marker(self, key, kind):
+        return os.path.join(self.cache_dir, f"{key}.{kind}")
+
+    def _set_marker(self, key, kind):
+        try:
+            with open(self._marker(key, kind), "w"):
+                pass
+        except OSError:
+            pass
+
+    def _clear_marker(self, key, kind):
+        try:
+            os.remove(self._marker(key, kind))
+        except OSError:
+            pass
+
+    def submit(self, text):
+        """Queue ``text`` for background rendering and return its job id.
+
+        The job id is the cache key, so any worker sharing the cache
+        directory can answer ``status()`` for it.
+        """
+        if not text:
+            return None
+        key = self.key(text)
+        if self.lookup(text):
+            return key
+        self._set_marker(key, "pending")
+        with self._lock:
+            if self._executor is None:
+                # One renderer thread: pyttsx3 is not safe to drive concurrently
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+            executor = self._executor
+        executor.submit(self._run_job, text, key)
+        return key
+
+    def _run_job(self, text, key):
+        try:
+            if self.render(text) is None:
+                self._set_marker(key, "failed")
+        finally:
+            self._clear_marker(key, "pending")
+
+    def status(self, key):
+        """``ready``, ``pending``, ``failed`` or ``unknown`` for a job id."""
+        if os.path.exists(self.path_for(key)):
+            return "ready"
+        try:
+            age = time.time() - os.path.getmtime(self._marker(key, "pending"))
+            return "pending" if age < self.job_timeout else "failed"
+        except OSError:
+            pass
+        if os.path.exists(self._marker(key, "failed")):
+            return "failed"
+        return "unknown"
+
+    def wait(self, key, timeout):
+        """Poll ``status()`` until the job leaves ``pending`` or ``timeout`` passes."""
+        deadline = time.time() + timeout
+        state = self.status(key)
+        while state == "pending" and time.time() < deadline:
+            time.sleep(0.1)
+            state = self.status(key)
+        return state
+
+    def _render_to_cache(self, text, key):
+        path = self.path_for(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp{self.ext}"
+        # Engines write WAV; other formats are encoded from it before publishing
+        raw = tmp if self.format == "wav" else tmp + ".wav"
+        try:
+            self.renderer(text, raw, voice=self.voice, rate=self.rate)
+            if not os.path.exists(raw) or os.path.getsize(raw) == 0:
+                raise RuntimeError("renderer produced no audio")
+            if raw != tmp:
+                encode_audio(raw, tmp, self.format)
+                os.remove(raw)
+            os.replace(tmp, path)
+        except Exception as e:
+            self._count("failures")
+            print(f"TTS Error: {e}")
+            for leftover in {raw, tmp}:
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+            return None
+        self._count("renders")
+        self._clear_marker(key, "failed")
+        self.enforce_limit()
+        return self.url_for(key)
+
+    def stream(self, text, chunk_frames=4096):
+        """Yield ``text`` as one WAV byte stream, synthesized sentence by sentence.
+
+        Each sentence is rendered (and cached) on its own, so the first bytes
+        go out once the first sentence is ready. When every sentence renders,
+        the joined audio is also published as the cache entry for ``text``.
+        Requires a WAV cache.
+        """
+        path = self.path_for(self.key(text))
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp{self.ext}"
+        params = out = None
+        complete, finished = True, False
+        try:
+            for sentence in split_sentences(text):
+                if not self.render(sentence):
+                    complete = False
+                    continue
+                with wave.open(self.path_for(self.key(sentence)), "rb") as w:
+                    p = (w.getnchannels(), w.getsampwidth(), w.getframerate())
+                    if params is None:
+                        params = p
+                        out = wave.open(tmp, "wb")
+                        out.setnchannels(p[0])
+                        out.setsampwidth(p[1])
+                        out.setframerate(p[2])
+                        yield wav_stream_header(*p)
+                    elif p != params:
+                        print(f"TTS stream: skipping sentence with format {p}, expected {params}")
+                        complete = False
+                        continue
+                    while True:
+                        frames = w.readframes(chunk_frames)
+                        if not frames:
+                            break
+                        out.writeframes(frames)
+                        yield frames
+            finished = True
+        finally:
+            # Also runs when the client disconnects and the generator is closed
+            if out is not None:
+                out.close()
+                if finished and complete and len(split_sentences(text)) > 1:
+                    os.replace(tmp, path)
+                    self.enforce_limit()
+                else:
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
+
+    def enforce_limit(self):
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_file() and e.name.endswith(self.ext)
+                       and ".tmp" not in e.name]
+            entries = sorted((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries)
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._count("evictions")
+            except OSError:
+                pass
+
+    def prerender(self, texts):
+        """Render every text not already cached; returns how many were rendered.
+
+        Only one process at a time pre-renders a given cache directory, so
+        several gunicorn workers booting together do not repeat the work.
+        """
+        lock_file = None
+        if fcntl is not None:
+            lock_file = open(os.path.join(self.cache_dir, ".prerender.lock"), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return 0
+        rendered = failed_in_row = 0
+        try:
+            for text in dict.fromkeys(t for t in texts if t):
+                if os.path.exists(self.path_for(self.key(text))):
+                    continue
+                if self._render_to_cache(text, self.key(text)):
+                    rendered += 1
+                    failed_in_row = 0
+                else:
+                    failed_in_row += 1
+                    # The engine is most likely unavailable; leave it to on-demand renders
+                    if failed_in_row >= 3:
+                        break
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+        return rendered
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.counters)
+        try:
+            files = [e for e in os.scandir(self.cache_dir) if e.is_file() and e.name.endswith(self.ext)]
+            out["files"] = len(files)
+            out["bytes"] = sum(e.stat().st_size for e in files)
+        except OSError:
+            out["files"] = out["bytes"] = 0
+        out["max_bytes"] = self.max_bytes
+        out["format"] = self.format
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+        worker = getattr(self.renderer, "__self__", None)
+        if isinstance(worker, TTSWorker):
+            out["engine"] = worker.stats()
+        return out
+
+
+if __name__ == "__main__":
+    # Deploy-time pre-rendering: `python -m model.tts` from the backend directory
+    import sys
+    sys.path.insert(0, BASE_DIR)
+    from interviewer import Interviewer
+    interviewer = Interviewer(model_dir=os.path.join(BASE_DIR, "..", "model", "models"),
+                              db_path=os.path.join(BASE_DIR, "database", "interviews.db"))
+    cache = TTSCache()
+    count = cache.prerender(interviewer.bank_questions())
+    print(f"Pre-rendered {count} questions into {cache.cache_dir}")
+    print(cache.stats())
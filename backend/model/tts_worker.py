@@ -0,0 +1,195 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def select_voice(engine, voice):
+    # Set voice to female if possible (based on user preference)
+    if voice == "female":
+        for v in engine.getProperty('voices'):
+            name = (v.name or "").lower()
+            if 'female' in name or 'zira' in name or 'woman' in name or 'girl' in name:
+                engine.setProperty('voice', v.id)
+                return
+    elif voice:
+        engine.setProperty('voice', voice)
+
+
+class TTSWorker:
+    """One long-lived ``python -m model.tts_worker`` process owning a pyttsx3 engine.
+
+    The engine is initialized and its voice resolved once. Jobs go through a
+    bounded queue and a single feeder thread, so they are rendered strictly
+    in order and Flask threads never drive pyttsx3 concurrently. A job that
+    exceeds ``job_timeout`` is treated as a wedged engine: the process is
+    killed and a fresh one is started for the next job. A caller waits at
+    most ``job_timeout`` for each job ahead of it plus its own, capped at
+    ``max_wait`` (kept under gunicorn's 120 s request timeout); a job whose
+    caller gave up is skipped.
+    """
+
+    def __init__(self, voice="female", rate=130, queue_depth=None, job_timeout=None, max_wait=None):
+        self.voice = voice
+        self.rate = rate
+        self.queue_depth = max(1, int(queue_depth or os.getenv("TTS_QUEUE_DEPTH", 32)))
+        self.job_timeout = float(job_timeout or os.getenv("TTS_RENDER_TIMEOUT", 30))
+        self.max_wait = float(max_wait or os.getenv("TTS_MAX_WAIT", 90))
+        self._jobs = queue.Queue(maxsize=self.queue_depth)
+        self._lock = threading.Lock()
+        self._proc = None
+        self._replies = None
+        self._feeder = None
+        self.restarts = 0
+        self.counters = {"jobs": 0, "errors": 0, "timeouts": 0, "rejected": 0, "abandoned": 0}
+
+    def render(self, text, path, voice=None, rate=None):
+        """Synthesize ``text`` to ``path``; raises on a full queue, timeout or engine error.
+
+        Matches the ``TTSCache`` renderer signature; ``voice``/``rate`` are fixed
+        when the engine starts, so per-call values are ignored.
+        """
+        slot = {"done": threading.Event(), "error": None, "abandoned": False}
+        with self._lock:
+            if self._feeder is None:
+                self._feeder = threading.Thread(target=self._serve, name="tts-engine", daemon=True)
+                self._feeder.start()
+        try:
+            self._jobs.put_nowait((text, path, slot))
+        except queue.Full:
+            self._count("rejected")
+            raise RuntimeError("TTS queue full")
+        # The feeder resolves every job within job_timeout of starting it, so
+        # this job is done after at most one timeout per job ahead of it
+        wait = min(self.job_timeout * (self._jobs.qsize() + 1), self.max_wait)
+        if not slot["done"].wait(wait):
+            with self._lock:
+                slot["abandoned"] = True
+                self.counters["abandoned"] += 1
+            raise RuntimeError(f"TTS render not finished after {wait:g}s")
+        if slot["error"]:
+            raise RuntimeError(slot["error"])
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _spawn(self):
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "model.tts_worker", "--voice", str(self.voice), "--rate", str(self.rate)],
+            cwd=BASE_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, encoding="utf-8", bufsize=1,
+        )
+        replies = queue.Queue()
+        threading.Thread(target=self._read, args=(proc, replies), name="tts-replies", daemon=True).start()
+        with self._lock:
+            if self._proc is not None:
+                self.restarts += 1
+            self._proc, self._replies = proc, replies
+
+    @staticmethod
+    def _read(proc, replies):
+        for line in proc.stdout:
+            replies.put(line)
+        replies.put(None)
+
+    def _kill(self):
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    def _serve(self):
+        while True:
+            text, path, slot = self._jobs.get()
+            with self._lock:
+                abandoned = slot["abandoned"]
+            if abandoned:
+                continue
+            self._count("jobs")
+            try:
+                if self._proc is None or self._proc.poll() is not None:
+                    if self._proc is not None:
+                        print(f"TTS engine process exited ({self._proc.returncode}); restarting")
+                    self._spawn()
+                self._proc.stdin.write(json.dumps({"text": text, "path": path}) + "\n")
+                self._proc.stdin.flush()
+                line = self._replies.get(timeout=self.job_timeout)
+                if line is None:
+                    slot["error"] = "engine process exited"
+                else:
+                    slot["error"] = json.loads(line).get("error")
+            except queue.Empty:
+                self._count("timeouts")
+                print(f"TTS engine wedged after {self.job_timeout}s; restarting")
+                self._kill()
+                slot["error"] = "TTS render timed out"
+            except (OSError, ValueError) as e:
+                self._kill()
+                slot["error"] = f"engine process failed: {e}"
+            if slot["error"]:
+                self._count("errors")
+            slot["done"].set()
+
+    def stats(self):
+        with self._lock:
+            alive = self._proc is not None and self._proc.poll() is None
+            out = dict(self.counters)
+            out.update({
+                "alive": alive,
+                "pid": self._proc.pid if alive else None,
+                "queued": self._jobs.qsize(),
+                "queue_depth": self.queue_depth,
+                "restarts": self.restarts,
+            })
+            return out
+
+    def close(self):
+        with self._lock:
+            proc = self._proc
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+
+
+def serve(voice, rate):
+    """Engine side: read JSON jobs from stdin, answer one JSON line per job."""
+    # Replies get their own descriptor so engine chatter on stdout cannot corrupt them
+    out = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+        select_voice(engine, voice)
+        engine.setProperty('rate', rate)
+        init_error = None
+    except Exception as e:
+        engine = None
+        init_error = f"engine unavailable: {e}"
+
+    for line in sys.stdin:
+        error = init_error
+        if engine is not None:
+            try:
+                job = json.loads(line)
+                engine.save_to_file(job["text"], job["path"])
+                engine.runAndWait()
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        out.write(json.dumps({"error": error}) + "\n")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--voice", default="female")
+    parser.add_argument("--rate", type=int, default=130)
+    args = parser.parse_args()
+    serve(args.voice, args.rate)
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class VADResult:
+    """Frame-level voice activity for a mono signal.
+
+    ``segments`` holds ``(start, end)`` sample offsets of contiguous speech,
+    ``rms`` and ``mask`` are per-frame arrays of ``frame`` samples each.
+    """
+
+    def __init__(self, frame, rms, mask, segments, num_samples):
+        self.frame = frame
+        self.rms = rms
+        self.mask = mask
+        self.segments = segments
+        self.num_samples = num_samples
+
+    @property
+    def speech_samples(self):
+        return int(sum(e - s for s, e in self.segments))
+
+
+def frame_rms(audio, frame):
+    """Per-frame RMS using a strided view; the last partial frame uses its own length."""
+    audio = np.asarray(audio, dtype=np.float32)
+    n = len(audio)
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    full = n // frame
+    rms = np.empty(full + (1 if n % frame else 0), dtype=np.float32)
+    if full:
+        view = np.lib.stride_tricks.as_strided(
+            audio, shape=(full, frame), strides=(audio.strides[0] * frame, audio.strides[0]), writeable=False
+        )
+        rms[:full] = np.sqrt(np.einsum("ij,ij->i", view, view) / frame)
+    if n % frame:
+        tail = audio[full * frame:]
+        rms[full] = np.sqrt(np.dot(tail, tail) / len(tail))
+    return rms
+
+
+def speech_mask(rms, floor=0.01, percentile=20):
+    """Keep frames at or above the given RMS percentile (never below ``floor``)."""
+    if len(rms) == 0:
+        return np.zeros(0, dtype=bool)
+    thr = max(floor, float(np.percentile(rms, percentile)))
+    return rms >= thr
+
+
+def mask_to_segments(mask, frame, num_samples):
+    """Convert a frame mask into ``(start, end)`` sample offsets of kept runs."""
+    if len(mask) == 0:
+        return []
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * frame
+    ends = np.minimum(np.flatnonzero(edges == -1) * frame, num_samples)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def detect_speech(audio, sr, frame_ms=20, floor=0.01, percentile=20):
+    frame = int(frame_ms / 1000.0 * sr)
+    if frame <= 0:
+        frame = 320
+    rms = frame_rms(audio, frame)
+    mask = speech_mask(rms, floor=floor, percentile=percentile)
+    segments = mask_to_segments(mask, frame, len(audio))
+    return VADResult(frame, rms, mask, segments, len(audio))
+
+
+def gather_speech(audio, vad):
+    """Concatenate the speech frames of ``audio`` with a single boolean gather."""
+    if not vad.segments:
+        return audio
+    keep = np.repeat(vad.mask, vad.frame)[:len(audio)]
+    return audio[keep]
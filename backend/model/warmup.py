@@ -0,0 +1,67 @@
+import threading
+import time
+
+
+class BackgroundLoader:
+    """Build an expensive object (a model, an engine) on a daemon thread.
+
+    ``state`` moves from ``loading`` to ``ready`` or ``failed``; ``get()``
+    never blocks, so request handlers can answer immediately while the
+    object is still warming up.
+    """
+
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, name, factory, start=True):
+        self.name = name
+        self.factory = factory
+        self.state = self.LOADING
+        self.value = None
+        self.error = None
+        self.started_at = None
+        self.load_seconds = None
+        self._done = threading.Event()
+        self._thread = None
+        if start:
+            self.start()
+
+    def start(self):
+        if self._thread is None:
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name=f"warmup-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        t0 = time.perf_counter()
+        try:
+            self.value = self.factory()
+            self.state = self.READY
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = self.FAILED
+            print(f"Warm-up of {self.name} failed: {self.error}")
+        finally:
+            self.load_seconds = round(time.perf_counter() - t0, 3)
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self.state == self.READY
+
+    def get(self):
+        return self.value if self.state == self.READY else None
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.get()
+
+    def status(self):
+        out = {"state": self.state, "load_seconds": self.load_seconds}
+        if self.state == self.LOADING and self.started_at:
+            out["elapsed_seconds"] = round(time.time() - self.started_at, 3)
+        if self.error:
+            out["error"] = self.error
+        return out
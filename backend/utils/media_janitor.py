@@ -0,0 +1,177 @@
+import os
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Directories under the media root whose children are per-session folders
+SESSION_PARENTS = ("", "tts", "answers")
+# Shared content-addressed TTS cache; trimmed by quota, never expired as a session
+CACHE_DIR = os.path.join("tts", "_cache")
+# Leftovers of interrupted renders and async TTS jobs inside the cache
+STALE_SUFFIXES = (".pending", ".failed", ".lock")
+
+
+class MediaJanitor:
+    """Keeps ``frontend/media`` bounded.
+
+    Each pass removes session folders (``media/<sid>``, ``media/tts/<sid>``,
+    ``media/answers/<sid>``) untouched for ``session_ttl`` seconds, stale
+    render leftovers in the TTS cache and empty directories, then deletes the
+    oldest files until everything below the media root fits in ``max_bytes``.
+    Files directly in the media root (bot.svg, bot.mp4) are never touched.
+    """
+
+    def __init__(self, media_root, max_bytes=None, session_ttl=None, interval=None):
+        self.media_root = media_root
+        self.max_bytes = int(max_bytes or os.getenv("MEDIA_MAX_BYTES", 1024 * 1024 * 1024))
+        self.session_ttl = float(session_ttl or os.getenv("MEDIA_SESSION_TTL", 24 * 3600))
+        self.interval = float(interval or os.getenv("MEDIA_JANITOR_INTERVAL", 600))
+        self.totals = {"runs": 0, "files_removed": 0, "dirs_removed": 0, "bytes_reclaimed": 0}
+        self.last_run = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _session_dirs(self):
+        skip = {os.path.join(self.media_root, p) for p in SESSION_PARENTS if p}
+        skip.add(os.path.join(self.media_root, CACHE_DIR))
+        for parent in SESSION_PARENTS:
+            try:
+                entries = list(os.scandir(os.path.join(self.media_root, parent)))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.path not in skip:
+                    yield entry.path
+
+    @staticmethod
+    def _walk_files(root):
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path, follow_symlinks=False)
+                except OSError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def _remove_file(self, path, size, report):
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        report["files_removed"] += 1
+        report["bytes_reclaimed"] += size
+        return True
+
+    def _remove_tree(self, path, report):
+        files = list(self._walk_files(path))
+        shutil.rmtree(path, ignore_errors=True)
+        if not os.path.exists(path):
+            report["files_removed"] += len(files)
+            report["bytes_reclaimed"] += sum(size for _, size, _ in files)
+            report["dirs_removed"] += 1
+
+    def _prune_empty(self, path, now, report):
+        # Grace period so a directory created just before its first write survives
+        try:
+            if not os.listdir(path) and now - os.path.getmtime(path) > 60:
+                os.rmdir(path)
+                report["dirs_removed"] += 1
+        except OSError:
+            pass
+
+    def run_once(self):
+        """One cleanup pass; returns what it removed and the bytes left."""
+        report = {"files_removed": 0, "dirs_removed": 0, "bytes_reclaimed": 0, "bytes_total": 0}
+        lock_file = None
+        if fcntl is not None and os.path.isdir(self.media_root):
+            # One gunicorn worker at a time sweeps the shared volume
+            lock_file = open(os.path.join(self.media_root, ".janitor.lock"), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                report["skipped"] = True
+                return report
+        try:
+            self._sweep(time.time(), report)
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+        with self._lock:
+            self.totals["runs"] += 1
+            for k in ("files_removed", "dirs_removed", "bytes_reclaimed"):
+                self.totals[k] += report[k]
+            self.last_run = dict(report, at=time.time())
+        if report["bytes_reclaimed"] or report["dirs_removed"]:
+            print(f"Media janitor: removed {report['files_removed']} files and {report['dirs_removed']} dirs, "
+                  f"reclaimed {report['bytes_reclaimed']} bytes ({report['bytes_total']} bytes in use)")
+        return report
+
+    def _sweep(self, now, report):
+        # Expire whole sessions by their most recent file
+        for path in list(self._session_dirs()):
+            files = list(self._walk_files(path))
+            last = max((m for m, _, _ in files), default=None)
+            if last is None:
+                self._prune_empty(path, now, report)
+            elif now - last > self.session_ttl:
+                self._remove_tree(path, report)
+
+        cache_dir = os.path.join(self.media_root, CACHE_DIR)
+        for mtime, size, path in list(self._walk_files(cache_dir)):
+            if (path.endswith(STALE_SUFFIXES) or ".tmp" in os.path.basename(path)) \
+                    and now - mtime > self.session_ttl:
+                self._remove_file(path, size, report)
+
+        # Quota: oldest first across everything below the media root
+        files = []
+        for name in self._top_dirs():
+            files.extend(self._walk_files(os.path.join(self.media_root, name)))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            if self._remove_file(path, size, report):
+                total -= size
+        report["bytes_total"] = total
+
+        for path in list(self._session_dirs()):
+            self._prune_empty(path, now, report)
+
+    def _top_dirs(self):
+        try:
+            return [e.name for e in os.scandir(self.media_root) if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="media-janitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Media janitor error: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            out = dict(self.totals)
+            out["last_run"] = self.last_run
+        out.update({"max_bytes": self.max_bytes, "session_ttl": self.session_ttl, "interval": self.interval})
+        return out
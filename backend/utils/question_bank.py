@@ -0,0 +1,169 @@
+import json
+import os
+import re
+import threading
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from utils.helpers import sanitize_text
+from utils.scoring import SEMANTIC_MODEL_NAME, compile_keyword_matcher, extract_expected_keywords
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BANKS_PATH = os.path.join(BASE_DIR, "data", "question_banks.json")
+# Optional question embeddings written by `python -m utils.question_bank --embed`
+DEFAULT_EMBEDDINGS_PATH = os.path.join(BASE_DIR, "data", "question_embeddings.npz")
+DEFAULT_ROLE = "Software Engineer"
+
+
+class Question(NamedTuple):
+    id: str
+    bank: str
+    question: str
+    text: str
+    normalized: str
+    expected_answer: str
+    expected_keywords: tuple
+    keyword_set: frozenset
+    question_tokens: frozenset
+    matcher: Optional[re.Pattern]
+    embedding: object = None
+
+
+def normalize_question(text):
+    return re.sub(r"\s+", " ", sanitize_text(text)).lower()
+
+
+def compile_question(qid, bank, question, expected_answer="", embedding=None):
+    keywords = tuple(extract_expected_keywords(expected_answer))
+    return Question(
+        id=qid,
+        bank=bank,
+        question=question,
+        text=sanitize_text(question),
+        normalized=normalize_question(question),
+        expected_answer=expected_answer,
+        expected_keywords=keywords,
+        keyword_set=frozenset(keywords),
+        question_tokens=frozenset(re.findall(r'[a-zA-Z]{3,}', question.lower())),
+        matcher=compile_keyword_matcher(keywords),
+        embedding=embedding,
+    )
+
+
+class QuestionIndex:
+    """Read-only view of the question banks, compiled once per process.
+
+    Questions are addressed by their stable ``id`` from the data file, so
+    interview state only has to carry ids; text, expected-answer keywords and
+    their matcher, and (if present) the question embedding hang off the id.
+    """
+
+    def __init__(self, data, embeddings=None):
+        embeddings = embeddings or {}
+        questions, banks, by_text = {}, {}, {}
+        for bank, entries in data["banks"].items():
+            ids = []
+            for entry in entries:
+                qid = entry["id"]
+                if qid in questions:
+                    raise ValueError(f"duplicate question id {qid!r}")
+                q = compile_question(qid, bank, entry["question"], entry.get("expected_answer", ""),
+                                     embeddings.get(qid))
+                questions[qid] = q
+                by_text.setdefault(q.normalized, qid)
+                ids.append(qid)
+            banks[bank] = tuple(ids)
+        self._questions = MappingProxyType(questions)
+        self._banks = MappingProxyType(banks)
+        self._by_text = MappingProxyType(by_text)
+        self._roles = MappingProxyType({k.lower(): v for k, v in data.get("roles", {}).items()})
+        self.has_embeddings = any(q.embedding is not None for q in questions.values())
+
+    def __len__(self):
+        return len(self._questions)
+
+    def get(self, qid):
+        return self._questions.get(qid)
+
+    def find(self, text):
+        """The question whose normalized text matches ``text``, if any."""
+        qid = self._by_text.get(normalize_question(text))
+        return self._questions[qid] if qid else None
+
+    def resolve(self, item):
+        """Question for an id, or for a legacy question dict kept in older session state."""
+        if isinstance(item, str):
+            return self._questions.get(item)
+        if isinstance(item, dict):
+            return self.find(item.get("question", "")) or compile_question(
+                "", "", item.get("question", ""), item.get("expected_answer", ""))
+        return None
+
+    def bank_name_for_role(self, role):
+        bank = self._roles.get((sanitize_text(role) or DEFAULT_ROLE).lower(), DEFAULT_ROLE)
+        if bank in self._banks:
+            return bank
+        return DEFAULT_ROLE if DEFAULT_ROLE in self._banks else "default"
+
+    def bank_ids(self, bank):
+        return self._banks.get(bank, ())
+
+    def questions(self):
+        return tuple(self._questions.values())
+
+
+def load_embeddings(path=None):
+    path = path or DEFAULT_EMBEDDINGS_PATH
+    if not os.path.exists(path):
+        return {}
+    try:
+        import numpy as np
+        data = np.load(path, allow_pickle=False)
+        if str(data["model"]) != SEMANTIC_MODEL_NAME:
+            print(f"Ignoring question embeddings built with {data['model']}")
+            return {}
+        return {str(qid): vec for qid, vec in zip(data["ids"], data["vectors"])}
+    except Exception as e:
+        print(f"Could not load question embeddings: {e}")
+        return {}
+
+
+def load_question_index(path=None, embeddings_path=None):
+    with open(path or DEFAULT_BANKS_PATH, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return QuestionIndex(data, load_embeddings(embeddings_path))
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_question_index():
+    """The process-wide index, built on first use."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = load_question_index()
+    return _INDEX
+
+
+def build_embeddings(index, path=None):
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(SEMANTIC_MODEL_NAME)
+    questions = index.questions()
+    vectors = model.encode([q.question for q in questions], normalize_embeddings=True)
+    np.savez(path or DEFAULT_EMBEDDINGS_PATH, ids=np.array([q.id for q in questions]),
+             vectors=np.asarray(vectors, dtype=np.float32), model=np.array(SEMANTIC_MODEL_NAME))
+    return len(questions)
+
+
+if __name__ == "__main__":
+    # `python -m utils.question_bank --embed` precomputes question embeddings
+    import sys
+    index = load_question_index()
+    if "--embed" in sys.argv:
+        print(f"Embedded {build_embeddings(index)} questions into {DEFAULT_EMBEDDINGS_PATH}")
+    else:
+        print(f"{len(index)} questions, embeddings: {index.has_embeddings}")
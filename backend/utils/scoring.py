@@ -23,6 +23,7 @@ except:
     SEMANTIC_MODEL_AVAILABLE = False
 
 # Global model instance (lazy loading)
+SEMANTIC_MODEL_NAME = 'all-MiniLM-L6-v2'
 _SEMANTIC_MODEL = None
 
 # Global HuggingFaceAnswerMatcher instance (lazy loading)
@@ -34,7 +35,7 @@ def get_semantic_model():
     global _SEMANTIC_MODEL
     if SEMANTIC_MODEL_AVAILABLE and _SEMANTIC_MODEL is None:
         try:
-            _SEMANTIC_MODEL = SentenceTransformer('all-MiniLM-L6-v2')
+            _SEMANTIC_MODEL = SentenceTransformer(SEMANTIC_MODEL_NAME)
         except Exception:
             pass
     return _SEMANTIC_MODEL
@@ -50,8 +51,32 @@ def get_hf_matcher():
     return _HF_MATCHER
 
 
-def compute_semantic_similarity(question: str, answer: str) -> float:
-    """Compute semantic similarity between question and answer using AI model."""
+# Words ignored when extracting keywords from an expected answer
+STOP_WORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should", "may", "might", "must", "can", "this", "that", "these", "those", "i", "you", "he", "she", "it", "we", "they", "me", "him", "her", "us", "them"})
+
+
+def extract_expected_keywords(expected_answer: str) -> List[str]:
+    """Significant words of an expected answer, in order and with repeats."""
+    if not expected_answer:
+        return []
+    expected_words = re.findall(r'\b[a-zA-Z]{3,}\b', expected_answer.lower())
+    return [word for word in expected_words if word not in STOP_WORDS]
+
+
+def compile_keyword_matcher(keywords):
+    """One regex that finds every whole-word occurrence of any keyword."""
+    distinct = sorted(set(keywords), key=len, reverse=True)
+    if not distinct:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(kw) for kw in distinct) + r')\b')
+
+
+def compute_semantic_similarity(question: str, answer: str, question_entry=None) -> float:
+    """Compute semantic similarity between question and answer using AI model.
+
+    ``question_entry`` (from the question index) supplies the precomputed
+    question tokens and embedding when available.
+    """
     if not question or not answer:
         return 0.0
     
@@ -71,14 +96,21 @@ def compute_semantic_similarity(question: str, answer: str) -> float:
     model = get_semantic_model()
     if model is None:
         # Fallback to keyword overlap if model not available
-        q_words = set(re.findall(r'[a-zA-Z]{3,}', question.lower()))
+        if question_entry is not None:
+            q_words = question_entry.question_tokens
+        else:
+            q_words = set(re.findall(r'[a-zA-Z]{3,}', question.lower()))
         a_words = set(re.findall(r'[a-zA-Z]{3,}', answer.lower()))
         overlap = len(q_words & a_words)
         return min(1.0, overlap / max(len(q_words), 1) * 2)  # Normalize to 0-1
     
     try:
-        # Encode question and answer
-        embeddings = model.encode([question, answer], normalize_embeddings=True)
+        if question_entry is not None and question_entry.embedding is not None:
+            # Question embedding was computed offline; only the answer is encoded
+            embeddings = [question_entry.embedding, model.encode([answer], normalize_embeddings=True)[0]]
+        else:
+            # Encode question and answer
+            embeddings = model.encode([question, answer], normalize_embeddings=True)
         # Compute cosine similarity (already normalized, so just dot product)
         similarity = float(np.dot(embeddings[0], embeddings[1]))
         # Map from [-1, 1] to [0, 1]
@@ -106,7 +138,7 @@ def preprocess_text(text: str) -> str:
     return text.strip()
 
 
-def analyze_answer_quality(text: str, question: str = "", track: str = "General", expected_keywords: list = None, expected_answer: str = None) -> dict:
+def analyze_answer_quality(text: str, question: str = "", track: str = "General", expected_keywords: list = None, expected_answer: str = None, question_entry=None) -> dict:
     """Analyze answer quality with focus on exact keyword matching with expected answers."""
     if not text:
         return {
@@ -139,20 +171,16 @@ def analyze_answer_quality(text: str, question: str = "", track: str = "General"
     ]
     refusal_count = sum(1 for phrase in refusal_phrases if phrase in text_lower)
     
-    # Extract keywords from expected answer for matching
-    expected_answer_keywords = []
-    if expected_answer:
-        # Extract significant words (exclude common stop words)
-        stop_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should", "may", "might", "must", "can", "this", "that", "these", "those", "i", "you", "he", "she", "it", "we", "they", "me", "him", "her", "us", "them"}
-        expected_words = re.findall(r'\b[a-zA-Z]{3,}\b', expected_answer.lower())
-        expected_answer_keywords = [word for word in expected_words if word not in stop_words]
-    
     # Expected answer keywords matching (higher priority)
-    expected_matches = []
-    for kw in expected_answer_keywords:
-        # Try exact match first
-        if re.search(r'\b' + re.escape(kw.lower()) + r'\b', text_lower):
-            expected_matches.append(kw)
+    if question_entry is not None:
+        # Keywords and their matcher were compiled once with the question index
+        expected_answer_keywords = list(question_entry.expected_keywords)
+        found = set(question_entry.matcher.findall(text_lower)) if question_entry.matcher else set()
+    else:
+        expected_answer_keywords = extract_expected_keywords(expected_answer)
+        matcher = compile_keyword_matcher(expected_answer_keywords)
+        found = set(matcher.findall(text_lower)) if matcher else set()
+    expected_matches = [kw for kw in expected_answer_keywords if kw in found]
     
     # Track-specific keyword matching
     track_keywords = ATS_KEYWORDS.get(track, ATS_KEYWORDS.get("General", []))
@@ -187,7 +215,7 @@ def analyze_answer_quality(text: str, question: str = "", track: str = "General"
     if expected_answer:
         # Use the actual AI semantic similarity function
         try:
-            semantic_similarity = compute_semantic_similarity(question, text)
+            semantic_similarity = compute_semantic_similarity(question, text, question_entry)
         except Exception:
             # Fallback to keyword matching overlap if AI fails
             if expected_answer_keywords:
@@ -303,7 +331,7 @@ def calculate_detailed_score(analysis: dict, question: str = "") -> Tuple[float,
     
     return total_score, feedback_items
 
-def score_answer(text: str, question: str = "", track: str = "General", expected_keywords: list = None, expected_answer: str = None) -> Tuple[int, str]:
+def score_answer(text: str, question: str = "", track: str = "General", expected_keywords: list = None, expected_answer: str = None, question_entry=None) -> Tuple[int, str]:
     """Enhanced answer scoring with detailed analysis and 100-point scale."""
     
     # Handle empty or placeholder answers
@@ -318,7 +346,7 @@ def score_answer(text: str, question: str = "", track: str = "General", expected
         return 1, "Blank answer - Zero score."
     
     # Analyze answer quality (focus on keyword matching with expected answer)
-    analysis = analyze_answer_quality(processed_text, question, track, expected_keywords, expected_answer)
+    analysis = analyze_answer_quality(processed_text, question, track, expected_keywords, expected_answer, question_entry)
     
     # Calculate detailed score
     detailed_score, feedback_items = calculate_detailed_score(analysis, question)
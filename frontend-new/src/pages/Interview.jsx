@@ -113,6 +113,23 @@ function Interview() {
     return () => clearInterval(interval);
   }, [isRecording]);
 
+  // Question audio is rendered after the response is sent; long-poll its status URL
+  const playTts = async (data) => {
+    let url = data.tts_url;
+    for (let i = 0; !url && data.tts_status_url && i < 3; i++) {
+      try {
+        const status = await axios.get(`${API_URL}${data.tts_status_url}`, { params: { wait: 10 } });
+        if (status.data.status === 'ready') url = status.data.tts_url;
+        else if (status.data.status !== 'pending') break;
+      } catch (error) {
+        break;
+      }
+    }
+    if (url) {
+      setBotAudioUrl(`${API_URL}${url}`);
+    }
+  };
+
   // Start interview
   const startInterview = async () => {
     setLoading(true);
@@ -130,10 +147,8 @@ function Interview() {
       setChatHistory([{ type: 'bot', text: response.data.question }]);
       setInterviewStarted(true);
 
-      // Play TTS if available
-      if (response.data.tts_url) {
-        setBotAudioUrl(`${API_URL}${response.data.tts_url}`);
-      }
+      // Play TTS once it is ready
+      playTts(response.data);
     } catch (error) {
       console.error('Error starting interview:', error);
       setWarning('Failed to start interview. Please try again.');
@@ -206,10 +221,8 @@ function Interview() {
           { type: 'bot', text: response.data.next_question }
         ]);
 
-        // Play TTS if available
-        if (response.data.tts_url) {
-          setBotAudioUrl(`${API_URL}${response.data.tts_url}`);
-        }
+        // Play TTS once it is ready
+        playTts(response.data);
       } else if (response.data.final_report) {
         // Interview completed
         setChatHistory(prev => [
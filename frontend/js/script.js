@@ -258,26 +258,9 @@ async function finalizeUpload() {
         const nextQ = data.next_question || null;
         if (nextQ) {
             addMsg("Interviewer: " + nextQ, "bot");
-            // Play TTS audio for next question if available
-            if (data.tts_url && botVoice) {
-                botVoice.src = data.tts_url;
-                // Handle autoplay policies by attempting to play after user interaction
-                const playPromise = botVoice.play();
-                if (playPromise !== undefined) {
-                    playPromise.catch(e => {
-                        console.log("Audio play failed:", e);
-                        // Try to play after a small delay
-                        setTimeout(() => {
-                            botVoice.play().catch(e2 => {
-                                console.log("Audio play failed on retry:", e2);
-                                // Show a message to the user that audio is not available
-                                addMsg("System: Audio playback failed. Please check your browser settings or click anywhere to enable audio.", "system");
-                            });
-                        }, 100);
-                    });
-                }
-            }
+            // The candidate can answer straight away; the audio follows when it is rendered
             setDisabled(recordBtn, false);
+            playQuestionAudio(data);
         } else {
             addMsg("System: Interview complete.", "system");
             setDisabled(recordBtn, true);
@@ -291,6 +274,53 @@ async function finalizeUpload() {
 }
 
 
+// Question audio is rendered after the response is sent; poll its status URL.
+// Each poll waits at most 2 s on the server, with a growing pause between polls.
+async function waitForTts(data) {
+    if (data.tts_url) return data.tts_url;
+    if (!data.tts_status_url) return null;
+    let pause = 250;
+    for (let i = 0; i < 8; i++) {
+        try {
+            const res = await fetch(data.tts_status_url + "?wait=2");
+            const status = await res.json();
+            if (status.status === "ready") return status.tts_url;
+            if (status.status !== "pending") return null;
+        } catch (e) {
+            return null;
+        }
+        await new Promise(resolve => setTimeout(resolve, pause));
+        pause = Math.min(pause * 2, 4000);
+    }
+    return null;
+}
+
+let questionAudioSeq = 0;
+
+// Not awaited by callers: the question is already shown and answerable
+async function playQuestionAudio(data) {
+    const seq = ++questionAudioSeq;
+    const ttsUrl = await waitForTts(data);
+    // Skip audio that arrives after the candidate started answering or a newer question
+    if (!ttsUrl || !botVoice || seq !== questionAudioSeq || isRecording) return;
+    botVoice.src = ttsUrl;
+    // Handle autoplay policies by attempting to play after user interaction
+    const playPromise = botVoice.play();
+    if (playPromise !== undefined) {
+        playPromise.catch(e => {
+            console.log("Audio play failed:", e);
+            // Try to play after a small delay
+            setTimeout(() => {
+                botVoice.play().catch(e2 => {
+                    console.log("Audio play failed on retry:", e2);
+                    // Show a message to the user that audio is not available
+                    addMsg("System: Audio playback failed. Please check your browser settings or click anywhere to enable audio.", "system");
+                });
+            }, 100);
+        });
+    }
+}
+
 function setupModalListeners() {
     const btns = document.querySelectorAll('.tech-btn');
     const customInput = document.getElementById('custom-tech');
@@ -409,26 +439,9 @@ async function startInterview(trackName) {
         const q = data.question || "";
         if (q) {
             addMsg("Interviewer: " + q, "bot");
-            // Play TTS audio if available
-            if (data.tts_url && botVoice) {
-                botVoice.src = data.tts_url;
-                // Handle autoplay policies by attempting to play after user interaction
-                const playPromise = botVoice.play();
-                if (playPromise !== undefined) {
-                    playPromise.catch(e => {
-                        console.log("Audio play failed:", e);
-                        // Try to play after a small delay
-                        setTimeout(() => {
-                            botVoice.play().catch(e2 => {
-                                console.log("Audio play failed on retry:", e2);
-                                // Show a message to the user that audio is not available
-                                addMsg("System: Audio playback failed. Please check your browser settings or click anywhere to enable audio.", "system");
-                            });
-                        }, 100);
-                    });
-                }
-            }
+            // The candidate can answer straight away; the audio follows when it is rendered
             setDisabled(recordBtn, false);
+            playQuestionAudio(data);
         } else {
             addMsg("System: No question received.", "system");
             setDisabled(recordBtn, false);